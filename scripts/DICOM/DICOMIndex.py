@@ -0,0 +1,279 @@
+from scripts.DICOM.Patient import Patient
+from scripts.DICOM.Study import Study
+from scripts.DICOM.Series import Series
+from scripts.DICOM.Image import Image
+from scripts.DICOM.Metadata import SeriesMetadata
+
+from contextlib import closing
+import sqlite3
+import sys
+import os
+
+
+"""
+Persistent on-disk index of parsed DICOMDir hierarchies. Stores the patient -> study -> series -> image tree
+along with the series attributes displayed in the patient table (venc, rr interval, reconstruction type,
+protocol name) so that re-opening a patient doesn't require parsing any image headers.
+
+Entries are keyed by DICOMDir path. An entry is only used if the modification time and size of the DICOMDir
+file still match; otherwise it is discarded and the DICOMDir is re-parsed.
+"""
+class DICOMIndex:
+    VERSION = 1
+
+    def __init__(self, indexPath=None):
+        if indexPath is None:
+            indexPath = os.path.join(self.getCacheDir(), 'dicom_index.sqlite')
+
+        self.indexPath = indexPath
+
+        try:
+            os.makedirs(os.path.dirname(self.indexPath), exist_ok=True)
+            self.createTables()
+
+        except (OSError, sqlite3.Error):
+            # index is an optimization. if we can't create it, fall back to parsing every time
+            self.indexPath = None
+
+    """
+    Retrieves the platform specific user cache directory for the application
+    ================== ===========================================================================
+    **Returns:**
+    cacheDir           cache directory path
+    ================== ===========================================================================
+    """
+    def getCacheDir(self):
+        if sys.platform == 'win32':
+            baseDir = os.environ.get('LOCALAPPDATA', os.path.expanduser('~'))
+
+        elif sys.platform == 'darwin':
+            baseDir = os.path.join(os.path.expanduser('~'), 'Library', 'Caches')
+
+        else:
+            baseDir = os.environ.get('XDG_CACHE_HOME', os.path.join(os.path.expanduser('~'), '.cache'))
+
+        return os.path.join(baseDir, 'NeuroFlow')
+
+    def connect(self):
+        return closing(sqlite3.connect(self.indexPath))
+
+    """
+    Creates the index tables. An index written with a different schema version is dropped and recreated
+    """
+    def createTables(self):
+        with self.connect() as connection, connection:
+            version = connection.execute("PRAGMA user_version").fetchone()[0]
+
+            if version != DICOMIndex.VERSION:
+                connection.execute("DROP TABLE IF EXISTS image")
+                connection.execute("DROP TABLE IF EXISTS series")
+                connection.execute("DROP TABLE IF EXISTS dicomdir")
+
+                connection.execute("PRAGMA user_version = %d" % DICOMIndex.VERSION)
+
+            connection.execute("CREATE TABLE IF NOT EXISTS dicomdir ("
+                               "id INTEGER PRIMARY KEY, "
+                               "path TEXT UNIQUE NOT NULL, "
+                               "mtime REAL NOT NULL, "
+                               "size INTEGER NOT NULL, "
+                               "patient_id TEXT)")
+
+            connection.execute("CREATE TABLE IF NOT EXISTS series ("
+                               "id INTEGER PRIMARY KEY, "
+                               "dicomdir_id INTEGER NOT NULL REFERENCES dicomdir(id) ON DELETE CASCADE, "
+                               "study_index INTEGER NOT NULL, "
+                               "study_id TEXT, "
+                               "series_index INTEGER NOT NULL, "
+                               "series_number INTEGER, "
+                               "protocol_name TEXT, "
+                               "venc INTEGER, "
+                               "rr_interval REAL, "
+                               "reconstruction_type TEXT)")
+
+            connection.execute("CREATE TABLE IF NOT EXISTS image ("
+                               "series_id INTEGER NOT NULL REFERENCES series(id) ON DELETE CASCADE, "
+                               "image_index INTEGER NOT NULL, "
+                               "path TEXT NOT NULL)")
+
+            connection.execute("CREATE INDEX IF NOT EXISTS series_dicomdir ON series(dicomdir_id)")
+            connection.execute("CREATE INDEX IF NOT EXISTS image_series ON image(series_id)")
+
+    """
+    Retrieves the modification time and size of a DICOMDir file
+    ================== ===========================================================================
+    **Arguments:**
+    dicomdir_path      file path of DICOMDir file
+
+    **Returns:**
+    mtime              modification time
+    size               file size (bytes)
+    ================== ===========================================================================
+    """
+    def getFileStamp(self, dicomdir_path):
+        stat = os.stat(dicomdir_path)
+
+        return stat.st_mtime, stat.st_size
+
+    """
+    Restores the patient hierarchy of a DICOMDir from the index. Images are restored with file paths only;
+    headers and pixel data are read on first access.
+    ================== ===========================================================================
+    **Arguments:**
+    dicomdir_path      file path of DICOMDir file
+
+    **Returns:**
+    patient            instance of Patient (None if DICOMDir isn't indexed or index is stale)
+    ================== ===========================================================================
+    """
+    def load(self, dicomdir_path):
+        if self.indexPath is None:
+            return None
+
+        dicomdir_path = os.path.abspath(dicomdir_path)
+
+        try:
+            mtime, size = self.getFileStamp(dicomdir_path)
+
+            with self.connect() as connection:
+                row = connection.execute("SELECT id, mtime, size, patient_id FROM dicomdir WHERE path = ?",
+                                         (dicomdir_path,)).fetchone()
+
+                if row is None:
+                    return None
+
+                dicomdirID, indexedMtime, indexedSize, patientID = row
+
+                if indexedMtime != mtime or indexedSize != size:
+                    return None
+
+                seriesRows = connection.execute("SELECT id, study_index, study_id, series_number, protocol_name, "
+                                                "venc, rr_interval, reconstruction_type FROM series "
+                                                "WHERE dicomdir_id = ? ORDER BY study_index, series_index",
+                                                (dicomdirID,)).fetchall()
+
+                imageRows = connection.execute("SELECT image.series_id, image.path FROM image "
+                                               "JOIN series ON series.id = image.series_id "
+                                               "WHERE series.dicomdir_id = ? "
+                                               "ORDER BY image.series_id, image.image_index",
+                                               (dicomdirID,)).fetchall()
+
+        except (OSError, sqlite3.Error):
+            return None
+
+        imagePaths = {}
+
+        for seriesID, imagePath in imageRows:
+            imagePaths.setdefault(seriesID, []).append(imagePath)
+
+        patient = Patient()
+        patient.attributes['patientID'] = patientID
+
+        study = None
+        prevStudyIndex = None
+
+        for seriesID, studyIndex, studyID, seriesNumber, protocolName, venc, rrInterval, seriesType in seriesRows:
+            if studyIndex != prevStudyIndex:
+                study = Study()
+                study.attributes['studyID'] = studyID
+                patient.studies.append(study)
+
+                prevStudyIndex = studyIndex
+
+            series = Series()
+            series.metadata = SeriesMetadata(seriesNumber=seriesNumber,
+                                             protocolName=protocolName,
+                                             venc=venc,
+                                             rrInterval=rrInterval,
+                                             reconstructionType=seriesType)
+
+            for imagePath in imagePaths.get(seriesID, []):
+                image = Image()
+                image.path = imagePath
+
+                series.images.append(image)
+
+            study.addSeries(series)
+
+        if not patient.studies:
+            return None
+
+        return patient
+
+    """
+    Stores the patient hierarchy of a DICOMDir in the index, replacing any existing entry
+    ================== ===========================================================================
+    **Arguments:**
+    dicomdir_path      file path of DICOMDir file
+    patient            instance of Patient loaded from DICOMDir
+    ================== ===========================================================================
+    """
+    def save(self, dicomdir_path, patient):
+        if self.indexPath is None or patient is None:
+            return
+
+        dicomdir_path = os.path.abspath(dicomdir_path)
+
+        try:
+            mtime, size = self.getFileStamp(dicomdir_path)
+
+            with self.connect() as connection, connection:
+                connection.execute("PRAGMA foreign_keys = ON")
+                connection.execute("DELETE FROM dicomdir WHERE path = ?", (dicomdir_path,))
+
+                dicomdirID = connection.execute("INSERT INTO dicomdir (path, mtime, size, patient_id) "
+                                                "VALUES (?, ?, ?, ?)",
+                                                (dicomdir_path, mtime, size,
+                                                 self.getAttribute(patient.getPatientID))).lastrowid
+
+                for studyIndex, study in enumerate(patient.studies):
+                    studyID = self.getAttribute(study.getStudyID)
+
+                    for seriesIndex, series in enumerate(study.series):
+                        seriesNumber = self.getAttribute(series.getSeriesNumber)
+
+                        seriesID = connection.execute(
+                            "INSERT INTO series (dicomdir_id, study_index, study_id, series_index, series_number, "
+                            "protocol_name, venc, rr_interval, reconstruction_type) "
+                            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                            (dicomdirID, studyIndex, studyID, seriesIndex,
+                             None if seriesNumber is None else int(seriesNumber),
+                             self.getAttribute(series.getProtocolName),
+                             self.getAttribute(series.getVenc),
+                             self.getAttribute(series.getRRInterval),
+                             self.getAttribute(series.getReconstructionType))).lastrowid
+
+                        connection.executemany("INSERT INTO image (series_id, image_index, path) VALUES (?, ?, ?)",
+                                               [(seriesID, imageIndex, os.path.abspath(image.path))
+                                                for imageIndex, image in enumerate(series.images)])
+
+        except (OSError, sqlite3.Error):
+            pass
+
+    """
+    Retrieves an attribute value in a form that can be stored in the index. Attributes that can't be parsed
+    are stored as None.
+    ================== ===========================================================================
+    **Arguments:**
+    getter             getter method of the attribute
+
+    **Returns:**
+    value              attribute value
+    ================== ===========================================================================
+    """
+    def getAttribute(self, getter):
+        try:
+            value = getter()
+
+        except:
+            return None
+
+        if value is None:
+            return None
+
+        if isinstance(value, int):
+            return int(value)
+
+        if isinstance(value, float):
+            return float(value)
+
+        return str(value)
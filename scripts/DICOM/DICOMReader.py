@@ -2,6 +2,8 @@ from scripts.DICOM.Patient import Patient
 from scripts.DICOM.Study import Study
 from scripts.DICOM.Series import Series
 from scripts.DICOM.Image import Image
+from scripts.DICOM.DecodePool import DecodePool
+from scripts.DICOM.VolumeCache import VolumeCache
 
 import pydicom as dicom
 from pydicom.filereader import read_dicomdir
@@ -14,8 +16,15 @@ Read in DICOMDir file using pydicom
 https://pydicom.github.io/pydicom/dev/auto_examples/input_output/plot_read_dicom_directory.html
 """
 class DICOMReader:
-    def __init__(self):
-        pass
+    def __init__(self, pool=None, index=None, volumeCache=None):
+        # worker pool used to decode pixel data. series keep a reference to it for on demand decoding
+        self.pool = pool if pool is not None else DecodePool()
+
+        # cache used to materialize series pixel data into contiguous (optionally disk-backed) volumes
+        self.volumeCache = volumeCache if volumeCache is not None else VolumeCache()
+
+        # (optional) persistent index of previously parsed DICOMDir hierarchies
+        self.index = index
 
     """
     Steps down DICOMDir hierarchy and saves each information entity (IE) into it's respective class:
@@ -24,21 +33,55 @@ class DICOMReader:
                 -> series
                     -> images
 
+    Can be run on a worker thread. A series is only added to it's study once all of it's images have been
+    read, so the patient can safely be displayed while loading is still in progress.
+
     ================== ===========================================================================
     **Arguments:**
     dicomdir_path      file path of DICOMDir file
+    lazy               (optional) if True, only image headers are read. pixel data is deferred and
+                       decoded on first access. Otherwise, pixel data is decoded for every image
+    progress           (optional) callback receiving a LoadProgress after every image read
+    seriesLoaded       (optional) callback receiving (patient, study, series) once a series is loaded
+    isCancelled        (optional) callback returning True if loading should stop
 
     **Returns:**
-    patient            instance of Patient
+    patient            instance of Patient (None if loading was cancelled)
     ================== ===========================================================================
     """
-    def load_patient_record(self, dicomdir_path):
+    def load_patient_record(self, dicomdir_path, lazy=True, progress=None, seriesLoaded=None, isCancelled=None):
+        loadProgress = LoadProgress()
+
+        # if this DICOMDir was parsed before (and hasn't changed since), restore it without reading any headers
+        if self.index is not None:
+            patient = self.index.load(dicomdir_path)
+
+            if patient is not None:
+                for study in patient.studies:
+                    for series in study.series:
+                        if isCancelled is not None and isCancelled():
+                            return None
+
+                        series.pool = self.pool
+                        series.volumeCache = self.volumeCache
+
+                        if not lazy:
+                            series.loadPixelData()
+                            loadProgress.addImages(series.images)
+
+                        loadProgress.seriesFound += 1
+                        self.notify(progress, seriesLoaded, loadProgress, patient, study, series)
+
+                return patient
+
         dicomdir = read_dicomdir(dicomdir_path)
 
         # we can't handle more than one patient at the moment
         if len(dicomdir.patient_records) > 1:
             return None
 
+        patient_dir = os.path.dirname(dicomdir_path)
+
         # iterate over patient records for a patient
         for patient_record in dicomdir.patient_records:
             patient = Patient()
@@ -59,30 +102,86 @@ class DICOMReader:
                     series = Series()
 
                     series.record = series_record
-                    study.series.append(series)
+                    series.pool = self.pool
+                    series.volumeCache = self.volumeCache
 
                     images = series_record.children
 
                     # iterate over image records for a series record
                     for image_record in images:
+                        if isCancelled is not None and isCancelled():
+                            return None
+
                         image = Image()
                         image.record = image_record
+                        image.path = os.path.join(patient_dir, image.record.ReferencedFileID)
+
+                        if lazy:
+                            # read header only. pixel data is decoded when the image is first accessed
+                            with open(image.path, 'rb') as fp:
+                                image.dataset = dicom.dcmread(fp, stop_before_pixels=True)
 
-                        patient_dir = os.path.dirname(dicomdir_path)
-                        image_path = os.path.join(patient_dir, image.record.ReferencedFileID)
-                        image.dataset = dicom.dcmread(image_path)
-                        image.pixel_array = image.dataset.pixel_array
+                                loadProgress.bytesRead += fp.tell()
+
+                            loadProgress.imagesRead += 1
+
+                            if progress is not None:
+                                progress(loadProgress)
 
                         series.images.append(image)
 
+                    if not lazy:
+                        series.loadPixelData()
+                        loadProgress.addImages(series.images)
+
+                    # series is complete. extract series attributes before exposing it
+                    series.metadata = series.loadMetadata()
+                    study.addSeries(series)
+
+                    loadProgress.seriesFound += 1
+                    self.notify(progress, seriesLoaded, loadProgress, patient, study, series)
+
+        if self.index is not None:
+            self.index.save(dicomdir_path, patient)
+
         return patient
 
+    """
+    Reports progress and a newly loaded series to the (optional) callbacks
+    """
+    def notify(self, progress, seriesLoaded, loadProgress, patient, study, series):
+        if progress is not None:
+            progress(loadProgress)
+
+        if seriesLoaded is not None:
+            seriesLoaded(patient, study, series)
+
     def load_dicom(self, dicom_path):
         image = dicom.dcmread(dicom_path)
 
         return image
 
-    def try_parse_dir(self, dir_path):
+    """
+    Builds the patient hierarchy from a directory of DICOM images without a DICOMDir file. Only the image 
+    headers are read (pixel data is deferred and decoded on first access). Images are grouped into their
+    respective information entities in a single pass:
+        -> patient (patient id)
+            -> study (study id)
+                -> series (series number)
+                    -> images (instance number)
+
+    ================== ===========================================================================
+    **Arguments:**
+    dir_path           directory containing DICOM images
+    progress           (optional) callback receiving a LoadProgress once a series is loaded
+    seriesLoaded       (optional) callback receiving (patient, study, series) once a series is loaded
+    isCancelled        (optional) callback returning True if loading should stop
+
+    **Returns:**
+    patient            instance of Patient (None if loading was cancelled)
+    ================== ===========================================================================
+    """
+    def try_parse_dir(self, dir_path, progress=None, seriesLoaded=None, isCancelled=None):
         images = []
 
         for root, dirs, files in os.walk(dir_path, topdown=True):
@@ -90,86 +189,101 @@ class DICOMReader:
                 if ("IMA" not in file) and ("dcm" not in file):
                     continue
 
-                dcmPath = os.path.join(root, file)
+                image = Image()
+                image.path = os.path.join(root, file)
 
-                try:
-                    image = Image()
-                    image.dataset = dicom.dcmread(dcmPath)
+                images.append(image)
 
-                    image.pixel_array = image.dataset.pixel_array
-
-                    images.append(image)
+        if isCancelled is not None and isCancelled():
+            return None
 
-                except:
-                    print('not a DICOM file!')
+        # read headers concurrently. files that can't be read aren't DICOM files
+        self.pool.readHeaders(images)
 
+        if isCancelled is not None and isCancelled():
+            return None
 
-        # let's first group all images into their respective series
-        # create a dictionary that pairs the image with it's series number
-        imageSeriesPair = {}
+        # group images by patient id -> study id -> series number in a single pass
+        groupedImages = defaultdict(lambda: defaultdict(lambda: defaultdict(list)))
 
         for image in images:
-            seriesNumber = image.getSeriesNumber()
-            imageSeriesPair.update({image: seriesNumber})
-
-        # group images by same series number
-        groupedImages = defaultdict(list)
+            if not image.isHeaderLoaded():
+                continue
 
-        for image, seriesNumber in sorted(imageSeriesPair.items(), key=lambda x: x[1], reverse=False):
-            groupedImages[seriesNumber].append(image)
-
-        _series = []
-        for key, val in groupedImages.items():
-            series = Series()
+            patientID = image.getPatientID()
+            studyID = image.getStudyID()
+            seriesNumber = image.getSeriesNumber()
 
-            series.images = groupedImages[key]
+            if seriesNumber is None:
+                continue
 
-            _series.append(series)
+            groupedImages[patientID][studyID][seriesNumber].append(image)
 
-        # now let's group all series into their respective study
-        # create a dictionary that pairs the image with it's study ID
-        seriesStudyPair = {}
+        if not groupedImages:
+            return None
 
-        for series in _series:
-            studyID = series.images[0].getStudyID()  # pick first image from series
-            seriesStudyPair.update({series: studyID})
+        # we are only saving the first patient because we can't handle multiple patients at the moment
+        patientID = sorted(groupedImages.keys(), key=self.sortKey)[0]
 
-        # group series by same study ID
-        groupedSeries = defaultdict(list)
+        patient = Patient()
 
-        for image, studyID in sorted(seriesStudyPair.items(), key=lambda x: x[1], reverse=False):
-            groupedSeries[studyID].append(image)
+        loadProgress = LoadProgress()
 
-        studies = []
-        for key, val in groupedSeries.items():
+        for studyID in sorted(groupedImages[patientID].keys(), key=self.sortKey):
             study = Study()
+            patient.studies.append(study)
 
-            study.series = groupedSeries[key]
+            groupedSeries = groupedImages[patientID][studyID]
 
-            studies.append(study)
+            for seriesNumber in sorted(groupedSeries.keys(), key=self.sortKey):
+                series = Series()
+                series.pool = self.pool
+                series.volumeCache = self.volumeCache
+                series.images = sorted(groupedSeries[seriesNumber], key=self.getInstanceNumber)
+                series.metadata = series.loadMetadata()
 
-        # finally let's group all studies into their respective patient
-        # create a dictionary that pairs the image with it's study ID
-        studyPatientPair = {}
+                study.addSeries(series)
 
-        for study in studies:
-            studyID = study.series[0].images[0].getStudyID()  # pick first image from series
-            studyPatientPair.update({study: studyID})
+                loadProgress.seriesFound += 1
+                loadProgress.addImages(series.images)
+                self.notify(progress, seriesLoaded, loadProgress, patient, study, series)
 
-        # group studies by same patient ID
-        groupedStudy = defaultdict(list)
+        return patient
 
-        for image, studyID in sorted(studyPatientPair.items(), key=lambda x: x[1], reverse=False):
-            groupedStudy[studyID].append(image)
+    """
+    Sort key that tolerates missing (None) values. Missing values are sorted last.
+    """
+    def sortKey(self, value):
+        return value is None, value
 
-        patient = None
+    """
+    Sort key for ordering images within a series by instance number
+    """
+    def getInstanceNumber(self, image):
+        return self.sortKey(image.metadata.instanceNumber)
 
-        # we are only saving the first patient because we can't handle multiple patients at the moment
-        for key, val in groupedStudy.items():
-            patient = Patient()
 
-            patient.studies = groupedStudy[key]
+"""
+Progress of a patient load
+    seriesFound        number of series loaded
+    imagesRead         number of images read (headers or pixel data)
+    bytesRead          number of bytes read from disk
+"""
+class LoadProgress:
+    def __init__(self):
+        self.seriesFound = 0
+        self.imagesRead = 0
+        self.bytesRead = 0
+
+    """
+    Adds a list of fully read images to the progress. Size of each image file is used as bytes read
+    """
+    def addImages(self, images):
+        for image in images:
+            self.imagesRead += 1
 
-            break
+            try:
+                self.bytesRead += os.path.getsize(image.path)
 
-        return patient
\ No newline at end of file
+            except (OSError, TypeError):
+                pass
@@ -0,0 +1,252 @@
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from itertools import repeat
+import pydicom as dicom
+import threading
+import os
+
+
+# value representations of bulk data elements (pixel data, private binary headers, etc.)
+BULK_VRS = ('OB', 'OD', 'OF', 'OL', 'OV', 'OW', 'UN')
+
+
+"""
+Reads a DICOM file and decodes its pixel data. Defined at module level so it can be sent to process workers.
+================== ===========================================================================
+**Arguments:**
+path               file path of DICOM image
+lean               (optional) if True, bulk data elements are stripped from the dataset once the
+                   pixel data is decoded
+stripPixels        (optional) if True, the encoded pixel data and pydicom's cached pixel array are removed
+                   from the dataset. used by process workers so the pixel data is only sent back once
+                   (as the decoded array)
+
+**Returns:**
+dataset            dataset of image (None if file couldn't be read)
+pixel_array        decoded pixel data (None if file couldn't be read)
+================== ===========================================================================
+"""
+def decodeImage(path, lean=False, stripPixels=False):
+    try:
+        dataset = dicom.dcmread(path)
+        pixel_array = dataset.pixel_array
+
+    except:
+        return None, None
+
+    if lean:
+        stripBulkData(dataset)
+
+    elif stripPixels:
+        stripPixelData(dataset)
+
+    return dataset, pixel_array
+
+
+"""
+Removes the encoded pixel data and pydicom's cached pixel array from a dataset
+================== ===========================================================================
+**Arguments:**
+dataset            pydicom dataset
+================== ===========================================================================
+"""
+def stripPixelData(dataset):
+    if 0x7fe00010 in dataset:  # 0x7fe0, 0x0010 represents pixel data
+        del dataset[0x7fe00010]
+
+    if getattr(dataset, '_pixel_array', None) is not None:
+        dataset._pixel_array = None
+
+
+"""
+Removes bulk data elements (pixel data and large binary elements) from a dataset. Used once the pixel data has been
+decoded so the raw bytes aren't kept in memory alongside the pixel array.
+================== ===========================================================================
+**Arguments:**
+dataset            pydicom dataset
+maxLength          (optional) binary elements longer than this (bytes) are removed
+================== ===========================================================================
+"""
+def stripBulkData(dataset, maxLength=1024):
+    bulkTags = []
+
+    for dataElement in dataset:
+        if dataElement.tag == 0x7fe00010:  # 0x7fe0, 0x0010 represents pixel data
+            bulkTags.append(dataElement.tag)
+
+        elif dataElement.VR in BULK_VRS and dataElement.value is not None and len(dataElement.value) > maxLength:
+            bulkTags.append(dataElement.tag)
+
+    for tag in bulkTags:
+        del dataset[tag]
+
+    # pydicom caches the decoded pixel array on the dataset. the image keeps it's own reference to it
+    if getattr(dataset, '_pixel_array', None) is not None:
+        dataset._pixel_array = None
+
+
+"""
+Reads the header of a DICOM file, stopping before the pixel data.
+================== ===========================================================================
+**Arguments:**
+path               file path of DICOM image
+
+**Returns:**
+dataset            header dataset of image (None if file couldn't be read)
+================== ===========================================================================
+"""
+def readHeader(path):
+    try:
+        return dicom.dcmread(path, stop_before_pixels=True)
+
+    except:
+        return None
+
+
+"""
+Worker pool used to decode the images of a series concurrently. Threads are used for uncompressed
+transfer syntaxes (reading is I/O-bound). Processes are used for compressed transfer syntaxes
+(decompression is CPU-bound and holds the GIL).
+
+In lean mode, bulk data elements are stripped from the datasets once the pixel data is decoded (roughly halves
+the memory used per image). The full dataset can still be re-read from file (see Image.getFullDataset).
+"""
+class DecodePool:
+    AUTO = 'Auto'
+    THREAD = 'Thread'
+    PROCESS = 'Process'
+
+    def __init__(self, mode=AUTO, workers=None, lean=False):
+        self.mode = mode
+        self.lean = lean
+        self.workers = workers if workers else (os.cpu_count() or 1)
+
+        # executors are created on first use. the lock guards creation since several workers can decode at once
+        self.threadExecutor = None
+        self.processExecutor = None
+        self.executorLock = threading.Lock()
+
+    """
+    Decodes the pixel data of the provided images concurrently. Results are assigned back to the images
+    in the order they were provided (instance order). Images that can't be decoded are left unloaded.
+    ================== ===========================================================================
+    **Arguments:**
+    images             list of images with file paths
+    ================== ===========================================================================
+    """
+    def decode(self, images):
+        images = [image for image in images if image.path is not None and not image.isLoaded()]
+
+        if not images:
+            return
+
+        paths = [image.path for image in images]
+
+        stripPixels = False
+
+        # no point in spinning up workers for a single image
+        if len(images) == 1 or self.workers == 1:
+            results = map(decodeImage, paths, repeat(self.lean))
+
+        else:
+            executor = self.getExecutor(images[0])
+
+            # results of process workers are pickled back. the pixel data is stripped from the datasets in the
+            # workers so it's only sent back once (as the decoded array)
+            stripPixels = isinstance(executor, ProcessPoolExecutor)
+
+            # map returns results in the order of the submitted paths
+            results = executor.map(decodeImage, paths, repeat(self.lean, len(paths)), repeat(stripPixels, len(paths)))
+
+        for image, (dataset, pixel_array) in zip(images, results):
+            if dataset is None:
+                continue
+
+            image.dataset = dataset
+            image.pixel_array = pixel_array
+            # the full dataset is re-read from file if the pixel data was stripped (see Image.getFullDataset)
+            image.bulkDataStripped = self.lean or stripPixels
+
+    """
+    Reads the headers (everything but the pixel data) of the provided images concurrently. Reading headers 
+    is I/O-bound so threads are always used. Images that can't be read are left without a dataset.
+    ================== ===========================================================================
+    **Arguments:**
+    images             list of images with file paths
+    ================== ===========================================================================
+    """
+    def readHeaders(self, images):
+        images = [image for image in images if image.path is not None]
+
+        if not images:
+            return
+
+        results = self.getThreadExecutor().map(readHeader, [image.path for image in images])
+
+        for image, dataset in zip(images, results):
+            image.dataset = dataset
+
+    """
+    Retrieves the executor to use for the provided image based on pool mode
+    ================== ===========================================================================
+    **Arguments:**
+    image              reference image of series
+
+    **Returns:**
+    executor           thread or process executor
+    ================== ===========================================================================
+    """
+    def getExecutor(self, image):
+        mode = self.mode
+
+        if mode == DecodePool.AUTO:
+            mode = DecodePool.PROCESS if self.isCompressed(image) else DecodePool.THREAD
+
+        if mode == DecodePool.PROCESS:
+            return self.getProcessExecutor()
+
+        return self.getThreadExecutor()
+
+    def getThreadExecutor(self):
+        with self.executorLock:
+            if self.threadExecutor is None:
+                self.threadExecutor = ThreadPoolExecutor(max_workers=self.workers)
+
+            return self.threadExecutor
+
+    def getProcessExecutor(self):
+        with self.executorLock:
+            if self.processExecutor is None:
+                self.processExecutor = ProcessPoolExecutor(max_workers=self.workers)
+
+            return self.processExecutor
+
+    """
+    Checks if the transfer syntax of an image is compressed
+    ================== ===========================================================================
+    **Arguments:**
+    image              the image
+
+    **Returns:**
+    isCompressed       True if pixel data is compressed
+    ================== ===========================================================================
+    """
+    def isCompressed(self, image):
+        try:
+            return image.dataset.file_meta.TransferSyntaxUID.is_compressed
+
+        except:
+            return False
+
+    """
+    Shuts down any running workers
+    """
+    def shutdown(self):
+        with self.executorLock:
+            threadExecutor, self.threadExecutor = self.threadExecutor, None
+            processExecutor, self.processExecutor = self.processExecutor, None
+
+        if threadExecutor is not None:
+            threadExecutor.shutdown(wait=False)
+
+        if processExecutor is not None:
+            processExecutor.shutdown(wait=False)
@@ -1,3 +1,9 @@
+import pydicom as dicom
+
+from scripts.DICOM.Metadata import ImageMetadata
+from scripts.DICOM.DecodePool import stripBulkData
+
+
 """
 Wrapper class for storing the Image information entity (IE) of the DICOM data model.
 The Image IE consists of several modules and each modules contains one or more attributes.
@@ -6,13 +12,143 @@ http://dicom.nema.org/medical/dicom/current/output/html/part03.html#sect_C.7.6.1
 Record is a Directory Record of type 'IMAGE' containing attributes from image modules (general image, mr image)
 DataSet contains data and sequence information associated with the image
 Pixel Array contains the pixel data associated with the image
+Path is the file path of the image. If set, the dataset (header) and pixel array are read from it on first
+access (lazy loading)
+Metadata is a compact record of the attributes used by the application. It is extracted once whenever a dataset
+is assigned and is kept when the dataset is released
+Bulk data stripped is True if bulk data elements (e.g. pixel data) were removed from the dataset after decoding
 
 """
 class Image:
     def __init__(self):
         self.record = None
-        self.dataset = None
-        self.pixel_array = None
+        self.path = None
+        self._dataset = None
+        self._metadata = None
+        self._pixel_array = None
+        self.bulkDataStripped = False
+
+    """
+    Dataset associated with the image. Reads the header (everything but pixel data) from file the first time 
+    it is accessed if it hasn't been loaded yet
+    ================== ===========================================================================
+    **Returns:**
+    dataset            pydicom dataset
+    ================== ===========================================================================
+    """
+    @property
+    def dataset(self):
+        if self._dataset is None and self.path is not None:
+            self.dataset = dicom.dcmread(self.path, stop_before_pixels=True)
+
+        return self._dataset
+
+    @dataset.setter
+    def dataset(self, dataset):
+        self._dataset = dataset
+        self.bulkDataStripped = False
+
+        if dataset is not None:
+            self._metadata = ImageMetadata(dataset)
+
+    """
+    Releases the dataset from memory. Metadata is kept; the dataset is re-read from file if it is accessed again
+    """
+    def releaseDataset(self):
+        if self.path is not None:
+            self._dataset = None
+
+    """
+    Releases the pixel array pydicom caches on the dataset once the image's pixel array is kept elsewhere (e.g. in a
+    series volume). The encoded pixel data bytes stay with the dataset unless bulk data was stripped
+    """
+    def releasePixelCache(self):
+        if getattr(self._dataset, '_pixel_array', None) is not None:
+            self._dataset._pixel_array = None
+
+    """
+    Metadata associated with the image. Reads the header from file if metadata hasn't been extracted yet
+    ================== ===========================================================================
+    **Returns:**
+    metadata           ImageMetadata
+    ================== ===========================================================================
+    """
+    @property
+    def metadata(self):
+        if self._metadata is None:
+            # assigning the dataset extracts the metadata
+            self.dataset
+
+        return self._metadata
+
+    """
+    Checks if the dataset has already been read
+    ================== ===========================================================================
+    **Returns:**
+    isHeaderLoaded     True if dataset is in memory
+    ================== ===========================================================================
+    """
+    def isHeaderLoaded(self):
+        return self._dataset is not None
+
+    """
+    Pixel data associated with the image. Decodes the pixel data from file the first time it is accessed 
+    if it hasn't been loaded yet
+    ================== ===========================================================================
+    **Returns:**
+    pixel_array        ndarray of pixel data
+    ================== ===========================================================================
+    """
+    @property
+    def pixel_array(self):
+        if self._pixel_array is None and self.path is not None:
+            self.loadPixelData()
+
+        return self._pixel_array
+
+    @pixel_array.setter
+    def pixel_array(self, pixel_array):
+        self._pixel_array = pixel_array
+
+    """
+    Checks if the pixel data has already been decoded
+    ================== ===========================================================================
+    **Returns:**
+    isLoaded           True if pixel array is in memory
+    ================== ===========================================================================
+    """
+    def isLoaded(self):
+        return self._pixel_array is not None
+
+    """
+    Reads the full dataset (header and pixel data) from file and decodes the pixel array
+    ================== ===========================================================================
+    **Arguments:**
+    lean               (optional) if True, bulk data elements are stripped from the dataset once the
+                       pixel data is decoded
+    ================== ===========================================================================
+    """
+    def loadPixelData(self, lean=False):
+        self.dataset = dicom.dcmread(self.path)
+        self._pixel_array = self.dataset.pixel_array
+
+        if lean:
+            stripBulkData(self.dataset)
+            self.bulkDataStripped = True
+
+    """
+    Retrieves the complete dataset, including any bulk data elements. If the bulk data was stripped from the
+    retained dataset, the dataset is re-read from file (and not kept in memory)
+    ================== ===========================================================================
+    **Returns:**
+    dataset            pydicom dataset
+    ================== ===========================================================================
+    """
+    def getFullDataset(self):
+        if self.bulkDataStripped and self.path is not None:
+            return dicom.dcmread(self.path)
+
+        return self.dataset
 
     """
     Retrieves pixel area of image
@@ -22,9 +158,8 @@ class Image:
     ================== ===========================================================================
     """
     def getPixelArea(self):
-        pixelAttr = 0x0028, 0x0030  # 0x0028, 0x0030 represents pixel spacing
-        pixelArea = self.dataset[pixelAttr].value
-        pixelArea = pixelArea[0] * pixelArea[1]
+        pixelSpacing = self.metadata.pixelSpacing
+        pixelArea = pixelSpacing[0] * pixelSpacing[1]
 
         return pixelArea
 
@@ -36,8 +171,7 @@ class Image:
     ================== ===========================================================================
     """
     def getProtocolName(self):
-        protocolNameAttr = 0x0018, 0x1030  # 0x0018, 0x1030 represents the protocol name
-        protocolName = self.dataset[protocolNameAttr].value
+        protocolName = self.metadata.protocolName
 
         return protocolName
 
@@ -49,8 +183,7 @@ class Image:
     ================== ===========================================================================
     """
     def getAcquisitionTime(self):
-        acquisitionTimeAttr = 0x0008, 0x0032  # 0x0008, 0x0032 represents the acquisition time
-        acquisitionTime = self.dataset[acquisitionTimeAttr].value
+        acquisitionTime = self.metadata.acquisitionTime
 
         return acquisitionTime
 
@@ -62,8 +195,7 @@ class Image:
     ================== ===========================================================================
     """
     def getSeriesNumber(self):
-        seriesAttr = 0x0020, 0x0011 # 0x0020, 0x0011 represents the series number
-        seriesNumber = self.dataset[seriesAttr].value
+        seriesNumber = self.metadata.seriesNumber
 
         return seriesNumber
 
@@ -75,8 +207,7 @@ class Image:
     ================== ===========================================================================
     """
     def getPatientID(self):
-        patientAttr = 0x0010, 0x0020  # 0x0010, 0x0020 represents patient ID
-        patientID = self.dataset[patientAttr].value
+        patientID = self.metadata.patientID
 
         return patientID
 
@@ -88,7 +219,6 @@ class Image:
     ================== ===========================================================================
     """
     def getStudyID(self):
-        studyAttr = 0x0020, 0x0010  # 0x0020, 0x0010 represents study ID
-        studyID = self.dataset[studyAttr].value
+        studyID = self.metadata.studyID
 
         return studyID
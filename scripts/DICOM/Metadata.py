@@ -0,0 +1,82 @@
+"""
+Retrieves the value of a data element from a dataset
+================== ===========================================================================
+**Arguments:**
+dataset            pydicom dataset
+tag                (group, element) tag of data element
+
+**Returns:**
+value              value of data element (None if dataset doesn't contain data element)
+================== ===========================================================================
+"""
+def getValue(dataset, tag):
+    try:
+        return dataset[tag].value
+
+    except:
+        return None
+
+
+"""
+Compact record of the image attributes used by the application. Attributes are extracted from the image dataset
+once (when the dataset is read) so that the dataset doesn't have to be indexed by tag repeatedly and can be
+released from memory when it isn't needed.
+    pixelSpacing       (row spacing, column spacing) in mm
+    triggerTime        trigger time (ms)
+    acquisitionTime    time of image acquisition
+    instanceNumber     instance number of image in series
+    seriesNumber       series number
+    seriesInstanceUID  series instance UID
+    seriesDescription  series description
+    protocolName       protocol name
+    studyID            study ID
+    patientID          patient ID
+    vencTag            private venc data element (0x0051, 0x1014)
+    imageTypeTag       private reconstruction type data element (0x0051, 0x1016)
+"""
+class ImageMetadata:
+    __slots__ = ('pixelSpacing', 'triggerTime', 'acquisitionTime', 'instanceNumber', 'seriesNumber',
+                 'seriesInstanceUID', 'seriesDescription', 'protocolName', 'studyID', 'patientID',
+                 'vencTag', 'imageTypeTag')
+
+    def __init__(self, dataset):
+        pixelSpacing = getValue(dataset, (0x0028, 0x0030))
+        self.pixelSpacing = None if pixelSpacing is None else (float(pixelSpacing[0]), float(pixelSpacing[1]))
+
+        triggerTime = getValue(dataset, (0x0018, 0x1060))
+        self.triggerTime = None if triggerTime is None else float(triggerTime)
+
+        instanceNumber = getValue(dataset, (0x0020, 0x0013))
+        self.instanceNumber = None if instanceNumber is None else int(instanceNumber)
+
+        seriesInstanceUID = getValue(dataset, (0x0020, 0x000e))
+        self.seriesInstanceUID = None if seriesInstanceUID is None else str(seriesInstanceUID)
+
+        self.acquisitionTime = getValue(dataset, (0x0008, 0x0032))
+        self.seriesNumber = getValue(dataset, (0x0020, 0x0011))
+        self.seriesDescription = getValue(dataset, (0x0008, 0x103e))
+        self.protocolName = getValue(dataset, (0x0018, 0x1030))
+        self.studyID = getValue(dataset, (0x0020, 0x0010))
+        self.patientID = getValue(dataset, (0x0010, 0x0020))
+        self.vencTag = getValue(dataset, (0x0051, 0x1014))
+        self.imageTypeTag = getValue(dataset, (0x0051, 0x1016))
+
+
+"""
+Compact record of the series level attributes. Computed once from the image metadata of a series (or restored
+from the DICOMDir index) and returned as is by the series getters.
+    seriesNumber       series number
+    protocolName       protocol name
+    venc               velocity encoding value (mm/s)
+    rrInterval         time for 1 heart beat (ms)
+    reconstructionType reconstruction type ("Phase", "Magnitude", "Difference")
+"""
+class SeriesMetadata:
+    __slots__ = ('seriesNumber', 'protocolName', 'venc', 'rrInterval', 'reconstructionType')
+
+    def __init__(self, seriesNumber=None, protocolName=None, venc=None, rrInterval=None, reconstructionType=None):
+        self.seriesNumber = seriesNumber
+        self.protocolName = protocolName
+        self.venc = venc
+        self.rrInterval = rrInterval
+        self.reconstructionType = reconstructionType
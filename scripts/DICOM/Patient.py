@@ -10,6 +10,7 @@ Studies stores a reference to a list of associated Study IE's, defined by the St
 class Patient:
     def __init__(self):
         self.record = None
+        self.attributes = {}
         self.studies = []
 
     """
@@ -20,6 +21,9 @@ class Patient:
     ================== ===========================================================================
     """
     def getPatientID(self):
+        if 'patientID' in self.attributes:
+            return self.attributes['patientID']
+
         if self.record is None:
             patientID = self.studies[0].series[0].images[0].getPatientID()  # check child image for patient ID
 
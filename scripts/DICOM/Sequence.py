@@ -1,33 +1,26 @@
 """
-Stores a list of all series that are associated with the same sequence
+Stores a list of all series that are associated with the same sequence. We will use the protocol name attribute 
+as the identifier due to subtle differences in the sequence names attribute. Is there a better attribute to look at?
+Series are indexed by reconstruction type as they are added so they can be looked up directly.
 """
 class Sequence:
-    def __init__(self, refSeries, study):
+    def __init__(self, name):
         self.series = []
-        self.name = None
-
-        self.setSequence(refSeries, study)
+        self.seriesByType = {}
+        self.name = name
 
     """
-    Finds and all series associated with same sequence as the provided series. We will use the 
-    protocol name attribute as the identifier due to subtle differences in the sequence names attribute.
-    Is there a better attribute to look at?
+    Adds a series to the sequence
     ================== ===========================================================================
     **Arguments:**
-    series             reference series
-    study              study
+    series             series with the same protocol name as the sequence
     ================== ===========================================================================
     """
-    def setSequence(self, refSeries, study):
-        self.name = refSeries.images[0].getProtocolName()
-
-        for series in study.series:
-            sequenceName = series.images[0].getProtocolName()
+    def addSeries(self, series):
+        self.series.append(series)
 
-            # check if the sequence name for the reference series matches the
-            # sequence name for the current series in the loop
-            if self.name == sequenceName:
-                self.series.append(series)
+        # if more than one series has the same type, the first one is used
+        self.seriesByType.setdefault(series.getReconstructionType(), series)
 
     """
     Finds and returns series of a given type. Options are "Phase", "Magnitude", "Difference"
@@ -37,11 +30,4 @@ class Sequence:
     ================== ===========================================================================
     """
     def getSeriesByType(self, type):
-        for series in self.series:
-            seriesType = series.getReconstructionType()
-
-            # check if series is a phase type
-            if seriesType == type:
-                return series
-
-        return None
\ No newline at end of file
+        return self.seriesByType.get(type)
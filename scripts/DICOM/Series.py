@@ -1,5 +1,8 @@
 import numpy as np
 
+from scripts.DICOM.VolumeCache import VolumeCache
+from scripts.DICOM.Metadata import SeriesMetadata
+
 """
 Wrapper class for storing the Series information entity (IE) of the DICOM data model. Each Series IE can have or
 more Image IE's. The Series IE consists of several modules and each modules contains one or more attributes.
@@ -7,6 +10,8 @@ http://dicom.nema.org/medical/dicom/current/output/html/part03.html#sect_C.7.3.1
 
 Record is a Directory Record of type 'SERIES' containing attributes from series modules
 Series stores a reference to a list of associated Image IE's, defined by the Image wrapper class.
+Metadata stores the series attributes. They are computed once from the image metadata (or restored from the
+DICOMDir index) and returned as is by the getters.
 
 """
 class Series:
@@ -14,6 +19,96 @@ class Series:
         self.record = None
         self.images = []
         self.parentSequence = None
+        self.pool = None
+        self.volumeCache = None
+        self.volume = None
+        self._metadata = None
+
+    """
+    Decodes the pixel data of every image in the series that hasn't been loaded yet. Used to load a series
+    on demand when patient was loaded lazily (headers only). Images are decoded concurrently if the series
+    has a decode pool.
+    """
+    def loadPixelData(self):
+        if self.pool is not None:
+            self.pool.decode(self.images)
+
+            return
+
+        for image in self.images:
+            if not image.isLoaded():
+                image.loadPixelData()
+
+    """
+    Retrieves the pixel data of the series as a single contiguous volume. The volume is only built once 
+    and shared by all consumers; callers should treat it as read-only and use views (e.g. transpose) rather 
+    than copies.
+    ================== ===========================================================================
+    **Returns:**
+    volume             ndarray (frames, rows, cols) in native pixel dtype
+    ================== ===========================================================================
+    """
+    def getVolume(self):
+        if self.volume is None:
+            if self.volumeCache is None:
+                self.volumeCache = VolumeCache()
+
+            self.volume = self.volumeCache.getVolume(self)
+
+        return self.volume
+
+    """
+    Series attributes. Computed from the image metadata the first time they are accessed
+    ================== ===========================================================================
+    **Returns:**
+    metadata           SeriesMetadata
+    ================== ===========================================================================
+    """
+    @property
+    def metadata(self):
+        if self._metadata is None:
+            self._metadata = self.loadMetadata()
+
+        return self._metadata
+
+    @metadata.setter
+    def metadata(self, metadata):
+        self._metadata = metadata
+
+    """
+    Computes the series attributes from the metadata of it's images
+    ================== ===========================================================================
+    **Returns:**
+    metadata           SeriesMetadata
+    ================== ===========================================================================
+    """
+    def loadMetadata(self):
+        metadata = SeriesMetadata()
+
+        if not self.images:
+            return metadata
+
+        imageMetadata = [image.metadata for image in self.images]
+
+        if self.record is None:
+            metadata.seriesNumber = imageMetadata[0].seriesNumber  # check child image for series number if no record
+
+        else:
+            metadata.seriesNumber = self.record.SeriesNumber
+
+        metadata.protocolName = imageMetadata[0].protocolName  # have to look at images to get protocol. using first.
+        metadata.rrInterval = self.parseRRInterval(imageMetadata)
+        metadata.venc = self.parseVenc(imageMetadata)
+        metadata.reconstructionType = self.parseReconstructionType(imageMetadata)
+
+        return metadata
+
+    """
+    Releases the datasets of the images from memory. Image metadata is kept
+    """
+    def releaseDatasets(self):
+        for image in self.images:
+            image.releaseDataset()
 
     """
     Calculates rrInterval
@@ -23,14 +118,14 @@ class Series:
     ================== ===========================================================================
     """
     def getRRInterval(self):
-        if len(self.images) < 2:
-            return None
+        return self.metadata.rrInterval
 
-        triggerTimeAttr = 0x0018, 0x1060
+    def parseRRInterval(self, imageMetadata):
+        if len(imageMetadata) < 2:
+            return None
 
         try:
-            rrInterval = (self.images[1].dataset[triggerTimeAttr].value -
-                          self.images[0].dataset[triggerTimeAttr].value) * len(self.images)
+            rrInterval = (imageMetadata[1].triggerTime - imageMetadata[0].triggerTime) * len(imageMetadata)
 
         except:
             rrInterval = None
@@ -64,13 +159,15 @@ class Series:
     ================== ===========================================================================
     """
     def getVenc(self):
-        # let's try the private tag method first:
-        vencAttr = 0x0051, 0x1014  # 0x0051, 0x1014 represents private tag data. venc value is defined here
+        return self.metadata.venc
+
+    def parseVenc(self, imageMetadata):
+        # let's try the private tag method first. venc value is defined in private tag 0x0051, 0x1014
         venc = None
 
-        for image in self.images:
+        for metadata in imageMetadata:
             try:
-                venc = image.dataset[vencAttr].value
+                venc = metadata.vencTag
                 venc = venc.split('_')[0]
                 venc = venc[1:]
                 venc = int(venc)
@@ -79,15 +176,13 @@ class Series:
                 break
 
             except:
-                pass
+                venc = None
 
         if venc is None:
-            # 0x0008, 0x103e represents the series description. venc value can possibly be parsed from here
-            seriesDescriptionAttr = 0x0008, 0x103e
-
-            for image in self.images:
+            # venc value can possibly be parsed from the series description
+            for metadata in imageMetadata:
                 try:
-                    seriesDescription = image.dataset[seriesDescriptionAttr].value
+                    seriesDescription = metadata.seriesDescription
 
                     start_index = seriesDescription.find("p2_") + 3
                     end_index = seriesDescription.find("venc_")
@@ -114,8 +209,13 @@ class Series:
     ================== ===========================================================================
     """
     def getReconstructionType(self):
-        imageTypeAttr = 0x0051, 0x1016  # 0x0051, 0x1016 represents reconstruction type
-        seriesType = self.images[0].dataset[imageTypeAttr].value  # have to look at images to get type. using first.
+        return self.metadata.reconstructionType
+
+    def parseReconstructionType(self, imageMetadata):
+        seriesType = imageMetadata[0].imageTypeTag  # 0x0051, 0x1016. have to look at images to get type. using first.
+
+        if seriesType is None:
+            return None
 
         if "P" in seriesType:
             seriesType = "Phase"
@@ -139,10 +239,14 @@ class Series:
     ================== ===========================================================================
     """
     def getSeriesNumber(self):
-        if self.record is None:
-            seriesNumber = self.images[0].getSeriesNumber()  # check child image for series number if no record exists
+        return self.metadata.seriesNumber
 
-        else:
-            seriesNumber = self.record.SeriesNumber
-
-        return seriesNumber
\ No newline at end of file
+    """
+    Retrieves protocol name of series
+    ================== ===========================================================================
+    **Returns:**
+    protocolName       the name of the protocol
+    ================== ===========================================================================
+    """
+    def getProtocolName(self):
+        return self.metadata.protocolName
@@ -1,3 +1,6 @@
+from scripts.DICOM.Sequence import Sequence
+
+
 """
 Wrapper class for storing the Study information entity (IE) of the DICOM data model. Each Study IE can have or
 more Series IE's. The Study IE consists of several modules and each modules contains one or more attributes.
@@ -5,12 +8,36 @@ http://dicom.nema.org/medical/dicom/current/output/html/part03.html#sect_C.4
 
 Record is a Directory Record of type 'STUDY' containing attributes from study modules
 Series stores a reference to a list of associated Series IE's, defined by the Series wrapper class.
+Sequences indexes the series by protocol name. Series with the same protocol name share a Sequence.
 
 """
 class Study:
     def __init__(self):
         self.record = None
+        self.attributes = {}
         self.series = []
+        self.sequences = {}
+
+    """
+    Adds a series to the study and to the sequence matching it's protocol name
+    ================== ===========================================================================
+    **Arguments:**
+    series             the series
+    ================== ===========================================================================
+    """
+    def addSeries(self, series):
+        protocolName = series.getProtocolName()
+
+        sequence = self.sequences.get(protocolName)
+
+        if sequence is None:
+            sequence = Sequence(protocolName)
+            self.sequences[protocolName] = sequence
+
+        sequence.addSeries(series)
+        series.parentSequence = sequence
+
+        self.series.append(series)
 
     """
     Retrieves study id
@@ -20,6 +47,9 @@ class Study:
     ================== ===========================================================================
     """
     def getStudyID(self):
+        if 'studyID' in self.attributes:
+            return self.attributes['studyID']
+
         if self.record is None:
             studyID = self.series[0].images[0].getStudyID()  # check child image for study ID
 
@@ -0,0 +1,142 @@
+import numpy as np
+import os
+
+
+"""
+Materializes the pixel data of a series into a single contiguous (frames, rows, cols) volume. If a cache
+directory is provided, volumes are stored as memory-mapped .npy files that are re-used the next time the
+same series is opened (no pixel decoding required). Otherwise, volumes are held in memory.
+"""
+class VolumeCache:
+    def __init__(self, cacheDir=None):
+        self.cacheDir = cacheDir
+
+        if self.cacheDir is not None:
+            try:
+                os.makedirs(self.cacheDir, exist_ok=True)
+
+            except OSError:
+                self.cacheDir = None
+
+    """
+    Builds the volume for a series. Each image's pixel array is replaced with a view into the volume and the
+    decoded pixel array pydicom caches on each dataset is released, so the decoded pixel data is only stored once
+    (the encoded pixel data stays with the datasets unless they are lean).
+    ================== ===========================================================================
+    **Arguments:**
+    series             the series object
+
+    **Returns:**
+    volume             ndarray (frames, rows, cols) in native pixel dtype
+    ================== ===========================================================================
+    """
+    def getVolume(self, series):
+        volume = self.loadVolume(series)
+
+        if volume is None:
+            series.loadPixelData()
+
+            volume = self.createVolume(series)
+
+        for index, image in enumerate(series.images):
+            image.pixel_array = volume[index]
+            image.releasePixelCache()
+
+        return volume
+
+    """
+    Retrieves the file path of the cached volume for a series
+    ================== ===========================================================================
+    **Arguments:**
+    series             the series object
+
+    **Returns:**
+    volumePath         path of .npy file (None if series can't be cached on disk)
+    ================== ===========================================================================
+    """
+    def getVolumePath(self, series):
+        if self.cacheDir is None or not series.images:
+            return None
+
+        try:
+            seriesUID = series.images[0].metadata.seriesInstanceUID
+
+        except:
+            return None
+
+        if seriesUID is None:
+            return None
+
+        return os.path.join(self.cacheDir, seriesUID + '_' + str(len(series.images)) + '.npy')
+
+    """
+    Opens a previously cached volume for a series as a read-only memory map
+    ================== ===========================================================================
+    **Arguments:**
+    series             the series object
+
+    **Returns:**
+    volume             memory-mapped ndarray (None if volume isn't cached)
+    ================== ===========================================================================
+    """
+    def loadVolume(self, series):
+        volumePath = self.getVolumePath(series)
+
+        if volumePath is None or not os.path.isfile(volumePath):
+            return None
+
+        try:
+            volume = np.load(volumePath, mmap_mode='r')
+
+        except (OSError, ValueError):
+            return None
+
+        if volume.shape[0] != len(series.images):
+            return None
+
+        return volume
+
+    """
+    Copies the decoded pixel arrays of a series into a new contiguous volume. Volume is written to disk
+    and memory-mapped if a cache directory exists.
+    ================== ===========================================================================
+    **Arguments:**
+    series             the series object
+
+    **Returns:**
+    volume             ndarray (frames, rows, cols)
+    ================== ===========================================================================
+    """
+    def createVolume(self, series):
+        reference = series.images[0].pixel_array
+        shape = (len(series.images),) + reference.shape
+
+        volumePath = self.getVolumePath(series)
+
+        if volumePath is not None:
+            # write to a temporary file first so an interrupted write never leaves a partial volume behind
+            tempPath = volumePath + '.tmp'
+
+            try:
+                volume = np.lib.format.open_memmap(tempPath, mode='w+', dtype=reference.dtype, shape=shape)
+                self.fillVolume(volume, series)
+
+                volume.flush()
+                del volume
+
+                os.replace(tempPath, volumePath)
+
+                return np.load(volumePath, mmap_mode='r')
+
+            except OSError:
+                # disk cache is an optimization. fall back to an in-memory volume
+                pass
+
+        volume = np.empty(shape, dtype=reference.dtype)
+        self.fillVolume(volume, series)
+
+        return volume
+
+    def fillVolume(self, volume, series):
+        for index, image in enumerate(series.images):
+            volume[index] = image.pixel_array
@@ -1,3 +1,6 @@
+from scripts.Helper.VertexStore import VertexStore
+
+
 class SegmentationRegion:
     DEFAULT = "Default"
     BACKGROUND = "Background"
@@ -5,8 +8,10 @@ class SegmentationRegion:
     def __init__(self):
         self.id = None
         self.color = None
-        self.vertices = []
-        self.segments = []
+        self.vertices = VertexStore()
+        self.pathItem = None
         self.mask = None
+        self.frameMasks = None
+        self.roi = None
         self.image = None
         self.measures = None
@@ -0,0 +1,69 @@
+import numpy as np
+
+
+"""
+Compact form of a ROI. Stores the flat (row-major) indices of the ROI pixels instead of a full size mask, so the
+cost of a ROI is proportional to the number of pixels in the ROI rather than to the image size.
+
+A ROI is either static (the same pixels in every frame) or time-resolved (its own pixels in every frame, e.g.
+an auto-segmentation propagated across the cardiac cycle).
+    shape              (rows, cols) of the image the ROI was drawn on. (frames, rows, cols) if time-resolved
+    indices            flat indices of the ROI pixels into an array of the ROI shape
+"""
+class SparseROI:
+    def __init__(self, mask):
+        self.shape = mask.shape
+        self.indices = np.flatnonzero(mask)
+
+    def isTimeResolved(self):
+        return len(self.shape) == 3
+
+    def getFrameSize(self):
+        return self.shape[-2] * self.shape[-1]
+
+    """
+    Retrieves the number of ROI pixels in each frame
+    ================== ===========================================================================
+    **Arguments:**
+    numFrames          number of frames
+
+    **Returns:**
+    pixelCounts        ndarray (frames) of pixel counts
+    ================== ===========================================================================
+    """
+    def getPixelCounts(self, numFrames):
+        if self.isTimeResolved():
+            return np.bincount(self.indices // self.getFrameSize(), minlength=numFrames)
+
+        return np.full(numFrames, len(self.indices), dtype=np.int64)
+
+    """
+    Retrieves the flat indices of the ROI pixels of every frame into a (frames, rows, cols) volume
+    ================== ===========================================================================
+    **Arguments:**
+    numFrames          number of frames
+
+    **Returns:**
+    indices            ndarray of flat indices (ordered by frame)
+    ================== ===========================================================================
+    """
+    def getVolumeIndices(self, numFrames):
+        if self.isTimeResolved():
+            return self.indices
+
+        frameOffsets = np.arange(numFrames, dtype=np.int64)[:, np.newaxis] * self.getFrameSize()
+
+        return (frameOffsets + self.indices).ravel()
+
+    """
+    Rebuilds the full size boolean mask of the ROI
+    ================== ===========================================================================
+    **Returns:**
+    mask               boolean mask of the ROI shape
+    ================== ===========================================================================
+    """
+    def getMask(self):
+        mask = np.zeros(self.shape, dtype=bool)
+        mask.flat[self.indices] = True
+
+        return mask
@@ -0,0 +1,90 @@
+from collections import defaultdict
+import math
+
+
+"""
+Uniform grid spatial index over the vertices of segmentation regions. Vertices are bucketed into square cells so a
+hit test only looks at the vertices in the cells surrounding the query point instead of every vertex of every
+region.
+"""
+class VertexGrid:
+    def __init__(self, cellSize=2):
+        self.cellSize = cellSize
+
+        # cell -> list of (x, y, region)
+        self.cells = defaultdict(list)
+
+        # region -> cells containing it's vertices
+        self.regionCells = {}
+
+    def getCell(self, x, y):
+        return math.floor(x / self.cellSize), math.floor(y / self.cellSize)
+
+    """
+    Adds the vertices of a region to the index
+    ================== ===========================================================================
+    **Arguments:**
+    region             segmentation region
+    ================== ===========================================================================
+    """
+    def addRegion(self, region):
+        cells = set()
+
+        for x, y in region.vertices.getCoordinates():
+            cell = self.getCell(x, y)
+
+            self.cells[cell].append((x, y, region))
+            cells.add(cell)
+
+        self.regionCells[region] = cells
+
+    """
+    Removes the vertices of a region from the index
+    ================== ===========================================================================
+    **Arguments:**
+    region             segmentation region
+    ================== ===========================================================================
+    """
+    def removeRegion(self, region):
+        for cell in self.regionCells.pop(region, ()):
+            vertices = [vertice for vertice in self.cells[cell] if vertice[2] is not region]
+
+            if vertices:
+                self.cells[cell] = vertices
+
+            else:
+                del self.cells[cell]
+
+    def clear(self):
+        self.cells.clear()
+        self.regionCells.clear()
+
+    """
+    Finds the region with the vertex closest to a point
+    ================== ===========================================================================
+    **Arguments:**
+    x                  x coordinate of point
+    y                  y coordinate of point
+    radius             only vertices closer than radius are considered
+
+    **Returns:**
+    region             closest region (None if no vertex is within radius)
+    ================== ===========================================================================
+    """
+    def findRegion(self, x, y, radius):
+        minCellX, minCellY = self.getCell(x - radius, y - radius)
+        maxCellX, maxCellY = self.getCell(x + radius, y + radius)
+
+        closestRegion = None
+        closestDistance = radius
+
+        for cellX in range(minCellX, maxCellX + 1):
+            for cellY in range(minCellY, maxCellY + 1):
+                for verticeX, verticeY, region in self.cells.get((cellX, cellY), ()):
+                    distance = math.hypot(verticeX - x, verticeY - y)
+
+                    if distance < closestDistance:
+                        closestDistance = distance
+                        closestRegion = region
+
+        return closestRegion
@@ -0,0 +1,115 @@
+from PyQt5.QtCore import QPointF
+from array import array
+import numpy as np
+
+
+"""
+Compact vertex list of a segmentation region. Coordinates are stored in a flat array of doubles (x0, y0, x1, y1, ...)
+instead of a list of QPointF and the number of occurrences of each coordinate is kept in a hash map, so checking
+whether a vertex was already drawn is constant time no matter how long the contour gets. Vertices are handed out
+as QPointF so the store can be used wherever a list of vertices was used before.
+"""
+class VertexStore:
+    def __init__(self, vertices=()):
+        self.coordinates = array('d')
+
+        # (x, y) -> number of occurrences. built on first lookup
+        self.counts = None
+
+        for vertice in vertices:
+            self.append(vertice)
+
+    """
+    Creates a store from an array of coordinates without building a QPointF per vertex
+    ================== ===========================================================================
+    **Arguments:**
+    coordinates        Nx2 ndarray of (x, y) coordinates
+
+    **Returns:**
+    vertices           VertexStore
+    ================== ===========================================================================
+    """
+    @staticmethod
+    def fromCoordinates(coordinates):
+        vertices = VertexStore()
+        vertices.coordinates.frombytes(np.ascontiguousarray(coordinates, dtype=np.float64).tobytes())
+
+        return vertices
+
+    def __len__(self):
+        return len(self.coordinates) // 2
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[_index] for _index in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+
+        if not 0 <= index < len(self):
+            raise IndexError('vertex index out of range')
+
+        return QPointF(self.coordinates[2 * index], self.coordinates[2 * index + 1])
+
+    def __iter__(self):
+        coordinates = self.coordinates
+
+        for index in range(0, len(coordinates), 2):
+            yield QPointF(coordinates[index], coordinates[index + 1])
+
+    """
+    Appends a vertex to the store
+    ================== ===========================================================================
+    **Arguments:**
+    vertice            QPointF
+    ================== ===========================================================================
+    """
+    def append(self, vertice):
+        key = (vertice.x(), vertice.y())
+
+        self.coordinates.extend(key)
+
+        if self.counts is not None:
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def count(self, vertice):
+        if self.counts is None:
+            self.counts = {}
+
+            for key in self.getCoordinates():
+                self.counts[key] = self.counts.get(key, 0) + 1
+
+        return self.counts.get((vertice.x(), vertice.y()), 0)
+
+    def __contains__(self, vertice):
+        return self.count(vertice) > 0
+
+    """
+    Checks if a vertex occurs anywhere but the first position (equivalent to vertice in vertices[1:])
+    """
+    def containsAfterFirst(self, vertice):
+        if not len(self):
+            return False
+
+        return self.count(vertice) > (1 if self[0] == vertice else 0)
+
+    """
+    Checks if a vertex occurs anywhere but the last position (equivalent to vertice in vertices[:-1])
+    """
+    def containsBeforeLast(self, vertice):
+        if not len(self):
+            return False
+
+        return self.count(vertice) > (1 if self[-1] == vertice else 0)
+
+    """
+    Retrieves the coordinates of all vertices
+    ================== ===========================================================================
+    **Returns:**
+    coordinates        list of (x, y) tuples
+    ================== ===========================================================================
+    """
+    def getCoordinates(self):
+        coordinates = self.coordinates
+
+        return list(zip(coordinates[0::2], coordinates[1::2]))
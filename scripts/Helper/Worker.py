@@ -0,0 +1,80 @@
+from PyQt5.QtCore import QObject, QRunnable, pyqtSignal
+import threading
+import traceback
+import time
+
+
+"""
+Signals emitted by a worker. Signals are emitted from the worker thread and delivered to slots on the GUI thread.
+    progress           progress update (any object)
+    partial            partial result that is available before the worker finishes
+    result             return value of the worker function. not emitted if the worker was cancelled
+    error              formatted traceback if the worker function raised an exception
+    finished           worker is done (always emitted)
+"""
+class WorkerSignals(QObject):
+    progress = pyqtSignal(object)
+    partial = pyqtSignal(object)
+    result = pyqtSignal(object)
+    error = pyqtSignal(object)
+    finished = pyqtSignal()
+
+
+"""
+Runs a function on a QThreadPool thread so long running tasks don't block the GUI event loop. The function
+can report progress and partial results through the worker signals and should poll isCancelled to stop early.
+"""
+class Worker(QRunnable):
+    def __init__(self, fn, *args, **kwargs):
+        super().__init__()
+
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+
+        self.signals = WorkerSignals()
+
+        self.cancelled = threading.Event()
+
+        # minimum time (s) between progress updates. prevents flooding the GUI event loop
+        self.progressInterval = 0.1
+        self.lastProgress = 0
+
+    """
+    Requests the worker to stop. The worker function is responsible for checking isCancelled
+    """
+    def cancel(self):
+        self.cancelled.set()
+
+    def isCancelled(self):
+        return self.cancelled.is_set()
+
+    """
+    Emits a progress update if enough time has passed since the previous one
+    ================== ===========================================================================
+    **Arguments:**
+    progress           progress update
+    ================== ===========================================================================
+    """
+    def emitProgress(self, progress):
+        now = time.monotonic()
+
+        if now - self.lastProgress < self.progressInterval:
+            return
+
+        self.lastProgress = now
+        self.signals.progress.emit(progress)
+
+    def run(self):
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+
+        except Exception:
+            self.signals.error.emit(traceback.format_exc())
+
+        else:
+            if not self.isCancelled():
+                self.signals.result.emit(result)
+
+        finally:
+            self.signals.finished.emit()
@@ -1,8 +1,5 @@
-from scripts.UI.MainWindow import MainWindow
-from scripts.UI.Application import Application
-from scripts.UIControllers.UIController import UIController
-
 import sys
+import multiprocessing
 
 
 class FlowDyn:
@@ -10,6 +7,12 @@ class FlowDyn:
         pass
 
     def run(self):
+        # the GUI is imported here rather than at module level. spawned process workers re-import this module,
+        # and they only need the (Qt-free) worker functions
+        from scripts.UI.MainWindow import MainWindow
+        from scripts.UI.Application import Application
+        from scripts.UIControllers.UIController import UIController
+
         self.app = Application(sys)
         self.ui_main = MainWindow()
 
@@ -22,4 +25,7 @@ class FlowDyn:
 Entry point for entire application
 """
 if __name__ == '__main__':
+    # required for the process based DICOM decode and contour pools in frozen (PyInstaller) builds
+    multiprocessing.freeze_support()
+
     FlowDyn().run()
\ No newline at end of file
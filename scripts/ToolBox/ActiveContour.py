@@ -0,0 +1,43 @@
+from skimage.segmentation import active_contour
+
+
+# process workers only import this module (numpy and skimage), not the Qt application. keep it free of GUI imports
+# so spawned workers start quickly
+
+
+"""
+Fits an active contour to an image. Defined at module level so it can be sent to process workers.
+https://scikit-image.org/docs/dev/auto_examples/edges/plot_active_contours.html
+================== ===========================================================================
+**Arguments:**
+image              2D ndarray (row, col). expected to be smoothed
+snake              Nx2 ndarray of initial (row, col) snake coordinates
+
+**Returns:**
+snake              Nx2 ndarray of fitted (row, col) snake coordinates
+================== ===========================================================================
+"""
+def fitActiveContour(image, snake):
+    return active_contour(image=image, snake=snake, alpha=0.015, beta=10, gamma=0.001, coordinates='rc')
+
+
+"""
+Fits an active contour to consecutive frames. Each frame is seeded with the contour fitted to the frame before it,
+so the contour follows the ROI as it moves or pulses across the cardiac cycle.
+================== ===========================================================================
+**Arguments:**
+frames             list of 2D ndarrays (row, col) in propagation order
+snake              Nx2 ndarray of (row, col) snake coordinates the first frame is seeded with
+
+**Returns:**
+snakes             list of Nx2 ndarrays. fitted snake of each frame
+================== ===========================================================================
+"""
+def fitActiveContourChain(frames, snake):
+    snakes = []
+
+    for frame in frames:
+        snake = fitActiveContour(frame, snake)
+        snakes.append(snake)
+
+    return snakes
@@ -1,10 +1,22 @@
 from PyQt5.QtWidgets import QGraphicsObject
 from PyQt5 import QtGui, QtCore
-from PyQt5.QtCore import pyqtSignal
-from skimage.segmentation import active_contour
+from PyQt5.QtCore import pyqtSignal, QThreadPool
 from skimage.filters import gaussian
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from collections import OrderedDict
 import numpy as np
-import itertools
+import threading
+import logging
+import weakref
+import math
+import os
+
+from scripts.Helper.Worker import Worker
+from scripts.ToolBox.ActiveContour import fitActiveContour, fitActiveContourChain
+from scripts.ToolBox.PulsatilityMap import PulsatilityMap
+
+
+logger = logging.getLogger(__name__)
 
 
 """
@@ -12,6 +24,9 @@ Widget used to draw overlays on image. Must use same viewbox as image widget.
 """
 class AutoSegmentation(QGraphicsObject):
     newAutoSeg = pyqtSignal(object)
+    newAutoSegCine = pyqtSignal(object, int)
+    newCandidates = pyqtSignal(object)
+    autoSegProgress = pyqtSignal(object)
 
     def __init__(self, seriesGraphics, toolBar):
         super().__init__()
@@ -22,6 +37,63 @@ class AutoSegmentation(QGraphicsObject):
         self.toolBar = toolBar
         self.toolBar.autoSegBtn.autoSegSelected.connect(self.runAutoSeg)
 
+        # standard deviation of gaussian smoothing applied before fitting the contour
+        self.sigma = 3
+
+        # pixels added around the viewport so the contour isn't fit right at the crop edge
+        self.cropMargin = 10
+
+        # snake points per pixel of search area perimeter and bounds on the number of snake points
+        self.snakeDensity = 1
+        self.minSnakePoints = 32
+        self.maxSnakePoints = 400
+
+        # gaussian kernel radius is truncated at this many standard deviations (skimage default)
+        self.truncate = 4
+
+        # (image key, frame, sigma) -> (weak reference to image, covered bounds, tile bounds, smoothed tile). the
+        # tile grows to cover every region requested from the frame, so panning and zooming reuse it. least
+        # recently used tiles are evicted. large enough to hold every frame of a cine
+        self.smoothedFrames = OrderedDict()
+        self.maxSmoothedFrames = 64
+
+        # a cancelled worker may still be smoothing frames while the next one starts
+        self.smoothedFramesLock = threading.Lock()
+
+        # process pool used to propagate contours across the cine. created on first use and reused across runs
+        # (spawning workers is expensive). shut down when the application closes
+        self.workers = os.cpu_count() or 1
+        self.processExecutor = None
+        self.processExecutorLock = threading.Lock()
+
+        # time (s) between cancellation checks while waiting for a chain
+        self.pollInterval = 0.1
+
+        # frames propagated in a row by a single worker
+        self.minChainLength = 4
+
+        self.pulsatilityMap = PulsatilityMap()
+
+        # series displayed in the series graphics
+        self.series = None
+
+        # worker running the latest auto segmentation. results of any other worker are stale
+        self.autoSegWorker = None
+
+    """
+    Called when a series is selected
+    ================== ===========================================================================
+    **Arguments:**
+    series             the series object
+    ================== ===========================================================================
+    """
+    def seriesSelected(self, series):
+        self.series = series
+
+        # smoothed frames belong to the previous series
+        with self.smoothedFramesLock:
+            self.smoothedFrames.clear()
+
     """
     Runs auto segmentation routine
     """
@@ -29,11 +101,160 @@ class AutoSegmentation(QGraphicsObject):
         if autoSegBtn == self.toolBar.autoSegBtn.activeContourBtn:
             self.runActiveContour()
 
+        elif autoSegBtn == self.toolBar.autoSegBtn.activeContourCineBtn:
+            self.runActiveContourCine()
+
+        elif autoSegBtn == self.toolBar.autoSegBtn.vesselCandidatesBtn:
+            self.runVesselCandidates()
+
+        elif autoSegBtn == self.toolBar.autoSegBtn.cancelBtn:
+            self.cancelAutoSeg()
+
     """
     Use the active contour algorithm to fit a closed spline to the edge of an ROI
     https://scikit-image.org/docs/dev/auto_examples/edges/plot_active_contours.html
     """
     def runActiveContour(self):
+        if self.seriesGraphics.image is None:
+            return
+
+        rowBounds, colBounds = self.getSearchArea()
+
+        self.startAutoSeg(self.getActiveContour, (self.seriesGraphics.image, self.getImageKey(),
+                                                  self.seriesGraphics.currentIndex, rowBounds, colBounds),
+                          self.newAutoSeg.emit)
+
+    """
+    Use the active contour algorithm to fit a closed spline to the edge of an ROI in every frame of the series.
+    The contour of the current frame is propagated to the other frames (see getActiveContourCine)
+    """
+    def runActiveContourCine(self):
+        if self.seriesGraphics.image is None:
+            return
+
+        rowBounds, colBounds = self.getSearchArea()
+
+        referenceIndex = self.seriesGraphics.currentIndex
+
+        self.startAutoSeg(self.getActiveContourCine, (self.seriesGraphics.image, self.getImageKey(),
+                                                      referenceIndex, rowBounds, colBounds),
+                          lambda frameVertices: self.newAutoSegCine.emit(frameVertices, referenceIndex))
+
+    """
+    Proposes vessel candidates from the pulsatility of every pixel of the phase series of the displayed sequence
+    (see PulsatilityMap)
+    """
+    def runVesselCandidates(self):
+        if self.series is None or self.seriesGraphics.image is None:
+            return
+
+        phaseSeries = self.series.parentSequence.getSeriesByType("Phase")
+
+        # pulsatility can only be measured on the phase images, not the magnitude or complex difference images
+        if phaseSeries is None:
+            self.autoSegProgress.emit("Vessel candidates require a phase series")
+
+            return
+
+        # transpose into mask item (column-major) order (frame, col, row)
+        phaseVolume = phaseSeries.getVolume().transpose((0, 2, 1))
+
+        if phaseVolume.shape[1:] != self.seriesGraphics.image.shape[1:]:
+            self.autoSegProgress.emit("Phase series doesn't match the displayed series")
+
+            return
+
+        self.startAutoSeg(self.getVesselCandidates, (phaseVolume,), self.newCandidates.emit)
+
+    """
+    Runs an auto segmentation on a worker thread so the view can still be zoomed and panned while the contour is
+    fit. Starting an auto segmentation cancels the one that is running (if any). Only the result of the latest
+    auto segmentation is emitted.
+    ================== ===========================================================================
+    **Arguments:**
+    function           auto segmentation function. receives progress and isCancelled keyword arguments
+    args               positional arguments of function (read from the view on the GUI thread)
+    emitResult         called on the GUI thread with the result of function
+    ================== ===========================================================================
+    """
+    def startAutoSeg(self, function, args, emitResult):
+        self.cancelAutoSeg()
+
+        worker = Worker(function, *args)
+        worker.kwargs = {
+            'progress': worker.emitProgress,
+            'isCancelled': worker.isCancelled
+        }
+
+        worker.signals.progress.connect(lambda text, worker=worker: self.onAutoSegProgress(worker, text))
+        worker.signals.result.connect(lambda result, worker=worker: self.onAutoSegFinished(worker, result,
+                                                                                           emitResult))
+        worker.signals.error.connect(lambda error, worker=worker: self.onAutoSegError(worker, error))
+        worker.signals.finished.connect(lambda worker=worker: self.onWorkerFinished(worker))
+
+        self.autoSegWorker = worker
+
+        self.toolBar.autoSegBtn.setRunning(True)
+        self.autoSegProgress.emit("Auto segmentation...")
+
+        QThreadPool.globalInstance().start(worker)
+
+    """
+    Cancels the auto segmentation that is currently running (if any)
+    """
+    def cancelAutoSeg(self):
+        if self.autoSegWorker is None:
+            return
+
+        self.autoSegWorker.cancel()
+        self.autoSegWorker = None
+
+        self.toolBar.autoSegBtn.setRunning(False)
+        self.autoSegProgress.emit("")
+
+    def onAutoSegProgress(self, worker, text):
+        if worker is not self.autoSegWorker:
+            return
+
+        self.autoSegProgress.emit(text)
+
+    def onAutoSegFinished(self, worker, result, emitResult):
+        if worker is not self.autoSegWorker:
+            return
+
+        self.autoSegProgress.emit("")
+
+        # search area is outside the image
+        if result is None:
+            return
+
+        emitResult(result)
+
+    def onAutoSegError(self, worker, error):
+        if worker is not self.autoSegWorker:
+            return
+
+        logger.error("Auto segmentation failed\n%s", error)
+
+        self.autoSegProgress.emit("Auto segmentation failed")
+
+    def onWorkerFinished(self, worker):
+        if worker is not self.autoSegWorker:
+            return
+
+        self.autoSegWorker = None
+
+        self.toolBar.autoSegBtn.setRunning(False)
+
+    """
+    Determines the search area of the auto segmentation from the viewport
+    ================== ===========================================================================
+    **Returns:**
+    rowBounds          (min, max) row of search area
+    colBounds          (min, max) col of search area
+    ================== ===========================================================================
+    """
+    def getSearchArea(self):
         # find minimum and maximum view coordinates in x-direction
         minX = self.viewBox.viewRange()[0][0]
         maxX = self.viewBox.viewRange()[0][1]
@@ -46,45 +267,421 @@ class AutoSegmentation(QGraphicsObject):
         topLeft = QtCore.QPointF(minX, minY)
         topRight = QtCore.QPointF(maxX, minY)
         bottomLeft = QtCore.QPointF(minX, maxY)
-        bottomRight = QtCore.QPointF(maxX, maxY)
 
         # convert view coordinates to item coordinates
         topLeft = self.viewBox.mapFromViewToItem(self.imageItem, topLeft)
         topRight = self.viewBox.mapFromViewToItem(self.imageItem, topRight)
         bottomLeft = self.viewBox.mapFromViewToItem(self.imageItem, bottomLeft)
-        bottomRight = self.viewBox.mapFromViewToItem(self.imageItem, bottomRight)
 
         # round coordinates into whole numbers and determine row and column bounds
         rowBounds = (int(round(topLeft.y())), int(round(bottomLeft.y())))
         colBounds = (int(round(topLeft.x())), int(round(topRight.x())))
 
-        # create an elliptical search area with the major and minor axis matching row/col bounds
-        s = np.linspace(0, 2 * np.pi, 400)
+        return rowBounds, colBounds
+
+    """
+    Fits an active contour to a single frame
+    ================== ===========================================================================
+    **Arguments:**
+    image              3D ndarray (frame, col, row)
+    imageKey           stable identifier of image used to cache smoothed frames (see getImageKey)
+    frameIndex         index of frame to segment
+    rowBounds          (min, max) row of search area
+    colBounds          (min, max) col of search area
+    progress           (optional) callback receiving progress text
+    isCancelled        (optional) callback returning True if the segmentation should stop
+
+    **Returns:**
+    vertices           Nx2 int ndarray of (row, col) vertices (None if search area is outside the image or
+                       cancelled)
+    ================== ===========================================================================
+    """
+    def getActiveContour(self, image, imageKey, frameIndex, rowBounds, colBounds, progress=None,
+                         isCancelled=None):
+        crop = self.getCrop(image, rowBounds, colBounds)
+
+        if crop is None:
+            return None
+
+        frame = self.getCroppedFrame(image, imageKey, frameIndex, crop)
+
+        if isCancelled is not None and isCancelled():
+            return None
+
+        if progress is not None:
+            progress("Auto segmentation: fitting contour")
+
+        # use the active contour algorithm to identify roi.
+        snake = fitActiveContour(frame, self.getInitialSnake(rowBounds, colBounds, crop))
+
+        return self.getVertices(snake, crop)
+
+    """
+    Fits an active contour to every frame of a cine. The reference frame is fit first (seeded with the elliptical
+    search area). The other frames are then fit in parallel chains that walk away from the reference frame in both
+    directions around the (cyclic) cardiac cycle, each frame seeded with the contour of the frame before it. Chains
+    are split across the process pool. Each chain starts from the reference contour, so only the first frame of a
+    chain isn't seeded by its direct neighbor. A chain that is already running can't be interrupted; cancelling
+    drops the chains that haven't started and the running ones finish in the background (occupying their worker
+    until they do).
+    ================== ===========================================================================
+    **Arguments:**
+    image              3D ndarray (frame, col, row)
+    imageKey           stable identifier of image used to cache smoothed frames (see getImageKey)
+    referenceIndex     index of reference frame
+    rowBounds          (min, max) row of search area
+    colBounds          (min, max) col of search area
+    progress           (optional) callback receiving progress text
+    isCancelled        (optional) callback returning True if the segmentation should stop
+
+    **Returns:**
+    frameVertices      list of Nx2 int ndarrays of vertices of each frame (None if search area is outside
+                       the image or cancelled)
+    ================== ===========================================================================
+    """
+    def getActiveContourCine(self, image, imageKey, referenceIndex, rowBounds, colBounds, progress=None,
+                             isCancelled=None):
+        crop = self.getCrop(image, rowBounds, colBounds)
+
+        if crop is None:
+            return None
+
+        numFrames = image.shape[0]
+
+        frames = []
+
+        for index in range(numFrames):
+            if isCancelled is not None and isCancelled():
+                return None
+
+            frames.append(self.getCroppedFrame(image, imageKey, index, crop))
+
+        if progress is not None:
+            progress("Auto segmentation: 0/%d frames" % numFrames)
+
+        snakes = [None] * numFrames
+        snakes[referenceIndex] = fitActiveContour(frames[referenceIndex],
+                                                  self.getInitialSnake(rowBounds, colBounds, crop))
+
+        numFitted = 1
+
+        chains = self.getFrameChains(numFrames, referenceIndex)
+
+        if chains:
+            executor = self.getExecutor()
+
+            # only the cropped frames are sent to the workers
+            futures = [executor.submit(fitActiveContourChain, [frames[index] for index in chain],
+                                       snakes[referenceIndex])
+                       for chain in chains]
+
+            try:
+                for chain, future in zip(chains, futures):
+                    chainSnakes = None
+
+                    while chainSnakes is None:
+                        if isCancelled is not None and isCancelled():
+                            return None
+
+                        try:
+                            chainSnakes = future.result(timeout=self.pollInterval)
+
+                        except FutureTimeoutError:
+                            pass
+
+                    for index, snake in zip(chain, chainSnakes):
+                        snakes[index] = snake
+
+                    numFitted += len(chain)
+
+                    if progress is not None:
+                        progress("Auto segmentation: %d/%d frames" % (numFitted, numFrames))
+
+            finally:
+                # chains that haven't started yet are dropped. running chains finish in the background
+                for future in futures:
+                    future.cancel()
+
+        return [self.getVertices(snake, crop) for snake in snakes]
+
+    """
+    Finds vessel candidates in a phase volume
+    ================== ===========================================================================
+    **Arguments:**
+    image              3D phase ndarray (frame, col, row)
+    progress           (optional) callback receiving progress text
+    isCancelled        (optional) callback returning True if the segmentation should stop
+
+    **Returns:**
+    candidates         list of boolean masks (col, row) ranked from most to least likely (None if cancelled)
+    ================== ===========================================================================
+    """
+    def getVesselCandidates(self, image, progress=None, isCancelled=None):
+        if progress is not None:
+            progress("Auto segmentation: scanning for vessels")
+
+        candidates = self.pulsatilityMap.getCandidates(image)
+
+        if isCancelled is not None and isCancelled():
+            return None
+
+        return candidates
+
+    """
+    Splits the frames of a cine (except the reference frame) into chains of consecutive frames that walk away from
+    the reference frame. Half the frames are reached going forward in time and the other half going backward
+    (the cine covers one cardiac cycle, so the last frame neighbors the first)
+    ================== ===========================================================================
+    **Arguments:**
+    numFrames          number of frames
+    referenceIndex     index of reference frame
+
+    **Returns:**
+    chains             list of lists of frame indices in propagation order
+    ================== ===========================================================================
+    """
+    def getFrameChains(self, numFrames, referenceIndex):
+        numForward = numFrames // 2
+        numBackward = numFrames - 1 - numForward
+
+        forward = [(referenceIndex + step) % numFrames for step in range(1, numForward + 1)]
+        backward = [(referenceIndex - step) % numFrames for step in range(1, numBackward + 1)]
+
+        chains = []
+
+        for frames in (forward, backward):
+            if not frames:
+                continue
+
+            # each direction gets half the workers. chains are kept long enough to be worth a worker
+            numChains = max(1, min(math.ceil(self.workers / 2), len(frames) // self.minChainLength))
+            chainLength = math.ceil(len(frames) / numChains)
+
+            chains.extend(frames[index:index + chainLength] for index in range(0, len(frames), chainLength))
+
+        return chains
+
+    """
+    Retrieves the process pool used to fit contour chains. The pool is created on first use
+    ================== ===========================================================================
+    **Returns:**
+    executor           process pool executor
+    ================== ===========================================================================
+    """
+    def getExecutor(self):
+        with self.processExecutorLock:
+            if self.processExecutor is None:
+                self.processExecutor = ProcessPoolExecutor(max_workers=self.workers)
+
+            return self.processExecutor
+
+    """
+    Cancels any running auto segmentation and shuts down the process pool. Called when the application closes
+    """
+    def shutdown(self):
+        self.cancelAutoSeg()
+
+        with self.processExecutorLock:
+            executor, self.processExecutor = self.processExecutor, None
+
+        if executor is None:
+            return
+
+        # chains that haven't started are cancelled (cancel_futures requires python 3.9)
+        try:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        except TypeError:
+            executor.shutdown(wait=False)
+
+    """
+    Determines the image region the contour is fit to. There's no point fitting the contour to pixels that aren't
+    visible, so the image is cropped to the search area (plus margin)
+    ================== ===========================================================================
+    **Arguments:**
+    image              3D ndarray (frame, col, row)
+    rowBounds          (min, max) row of search area
+    colBounds          (min, max) col of search area
+
+    **Returns:**
+    crop               (rowOffset, rowEnd, colOffset, colEnd) (None if search area is outside the image)
+    ================== ===========================================================================
+    """
+    def getCrop(self, image, rowBounds, colBounds):
+        rowOffset = max(min(rowBounds) - self.cropMargin, 0)
+        colOffset = max(min(colBounds) - self.cropMargin, 0)
+        rowEnd = min(max(rowBounds) + self.cropMargin + 1, image.shape[2])
+        colEnd = min(max(colBounds) + self.cropMargin + 1, image.shape[1])
+
+        if rowEnd <= rowOffset or colEnd <= colOffset:
+            return None
+
+        return rowOffset, rowEnd, colOffset, colEnd
+
+    """
+    Retrieves the smoothed and cropped frame the contour is fit to
+    ================== ===========================================================================
+    **Arguments:**
+    image              3D ndarray (frame, col, row)
+    imageKey           stable identifier of image used to cache smoothed frames
+    frameIndex         index of frame
+    crop               (rowOffset, rowEnd, colOffset, colEnd)
+
+    **Returns:**
+    frame              2D ndarray (row, col)
+    ================== ===========================================================================
+    """
+    def getCroppedFrame(self, image, imageKey, frameIndex, crop):
+        rowOffset, rowEnd, colOffset, colEnd = crop
+
+        # transpose because active contour expects column-major (col, row) order? not sure why we do this actually
+        return self.getSmoothedFrame(image, imageKey, frameIndex, self.sigma,
+                                     (colOffset, colEnd, rowOffset, rowEnd)).T
+
+    """
+    Retrieves a stable identifier of the displayed image (file path of the first image of the series). Unlike
+    id(image), it isn't reused by another image once the displayed image is released
+    ================== ===========================================================================
+    **Returns:**
+    imageKey           file path (None if the series has no file paths)
+    ================== ===========================================================================
+    """
+    def getImageKey(self):
+        if self.series is None or not self.series.images:
+            return None
+
+        return self.series.images[0].path
+
+    """
+    Creates an elliptical search area with the major and minor axis matching row/col bounds
+    ================== ===========================================================================
+    **Arguments:**
+    rowBounds          (min, max) row of search area
+    colBounds          (min, max) col of search area
+    crop               (rowOffset, rowEnd, colOffset, colEnd)
+
+    **Returns:**
+    snake              Nx2 ndarray of (row, col) coordinates relative to the crop
+    ================== ===========================================================================
+    """
+    def getInitialSnake(self, rowBounds, colBounds, crop):
+        rowOffset, rowEnd, colOffset, colEnd = crop
 
         rCenter = (rowBounds[0] + rowBounds[1]) / 2
         cCenter = (colBounds[0] + colBounds[1]) / 2
-        r = rCenter + (rowBounds[1] - rCenter) * np.sin(s)
-        c = cCenter + (colBounds[1] - cCenter) * np.cos(s)
+
+        s = np.linspace(0, 2 * np.pi, self.getSnakeResolution(rowBounds[1] - rCenter, colBounds[1] - cCenter))
+
+        r = rCenter + (rowBounds[1] - rCenter) * np.sin(s) - rowOffset
+        c = cCenter + (colBounds[1] - cCenter) * np.cos(s) - colOffset
 
         # create search area array
-        init = np.array([r, c]).T
+        return np.array([r, c]).T
 
-        # transpose because active contour expects column-major (col, row) order? not sure why we do this actually
-        image = self.seriesGraphics.image[self.seriesGraphics.currentIndex, :, :].T
+    """
+    Converts a fitted snake into image vertices
+    ================== ===========================================================================
+    **Arguments:**
+    snake              Nx2 ndarray of (row, col) coordinates relative to the crop
+    crop               (rowOffset, rowEnd, colOffset, colEnd)
 
-        # use the active contour algorithm to identify roi.
-        # https://scikit-image.org/docs/dev/auto_examples/edges/plot_active_contours.html
-        snake = active_contour(image=gaussian(image, 3),
-                               snake=init, alpha=0.015, beta=10, gamma=0.001, coordinates='rc')
+    **Returns:**
+    vertices           Nx2 int ndarray of (row, col) vertices (sorted, no duplicates)
+    ================== ===========================================================================
+    """
+    def getVertices(self, snake, crop):
+        rowOffset, rowEnd, colOffset, colEnd = crop
 
-        # convert snake coordinates to whole numbers (let's round up and down to create maximum possible boundary area)
-        snake_floor = [[np.floor(i) for i in nested] for nested in snake]
-        snake_ceil = [[np.ceil(i) for i in nested] for nested in snake]
+        # move snake back to image coordinates
+        snake = snake + (rowOffset, colOffset)
 
-        snake = snake_floor + snake_ceil
+        # convert snake coordinates to whole numbers (let's round up and down to create maximum possible boundary area)
+        snake = np.vstack((np.floor(snake), np.ceil(snake))).astype(int)
 
         # remove duplicate coordinates
-        snake.sort()
-        snake = list(vertice for vertice, _ in itertools.groupby(snake))
+        return np.unique(snake, axis=0)
+
+    """
+    Retrieves a gaussian smoothed region of a frame. Only a tile covering the region (plus the radius of the
+    gaussian kernel) is smoothed; inside the region, the result is the same as smoothing the whole frame. Tiles
+    are cached per (image, frame, sigma) so re-running the auto segmentation doesn't smooth the frame again, even
+    if the view was panned or zoomed. A region outside the cached tile grows the tile to cover both.
+    ================== ===========================================================================
+    **Arguments:**
+    image              3D ndarray (frame, col, row)
+    imageKey           stable identifier of image (None to only cache by image instance)
+    frame              frame index
+    sigma              standard deviation of gaussian kernel
+    bounds             (colStart, colEnd, rowStart, rowEnd) of region
+
+    **Returns:**
+    smoothedFrame      2D ndarray (col, row) of region
+    ================== ===========================================================================
+    """
+    def getSmoothedFrame(self, image, imageKey, frame, sigma, bounds):
+        key = (id(image) if imageKey is None else imageKey, frame, sigma)
+
+        colStart, colEnd, rowStart, rowEnd = bounds
+
+        with self.smoothedFramesLock:
+            cached = self.smoothedFrames.get(key)
+
+        tile = None
+
+        # the image is only weakly referenced so the cache doesn't keep released volumes in memory. a tile of
+        # another image stored under the same key isn't a hit
+        if cached is not None and cached[0]() is image:
+            _, covered, tileBounds, tile = cached
+
+            if covered[0] <= colStart and colEnd <= covered[1] and covered[2] <= rowStart and rowEnd <= covered[3]:
+                with self.smoothedFramesLock:
+                    if key in self.smoothedFrames:
+                        self.smoothedFrames.move_to_end(key)
+
+            else:
+                covered = (min(covered[0], colStart), max(covered[1], colEnd),
+                           min(covered[2], rowStart), max(covered[3], rowEnd))
+                tile = None
+
+        else:
+            covered = bounds
+
+        if tile is None:
+            border = int(self.truncate * sigma + 0.5)
+
+            tileBounds = (max(covered[0] - border, 0), min(covered[1] + border, image.shape[1]),
+                          max(covered[2] - border, 0), min(covered[3] + border, image.shape[2]))
+
+            tile = gaussian(image[frame, tileBounds[0]:tileBounds[1], tileBounds[2]:tileBounds[3]], sigma,
+                            truncate=self.truncate)
+
+            with self.smoothedFramesLock:
+                self.smoothedFrames[key] = (weakref.ref(image), covered, tileBounds, tile)
+                self.smoothedFrames.move_to_end(key)
+
+                while len(self.smoothedFrames) > self.maxSmoothedFrames:
+                    self.smoothedFrames.popitem(last=False)
+
+        colOffset, rowOffset = tileBounds[0], tileBounds[2]
+
+        return tile[colStart - colOffset:colEnd - colOffset, rowStart - rowOffset:rowEnd - rowOffset]
+
+    """
+    Determines the number of snake points from the perimeter of the elliptical search area (Ramanujan's
+    approximation) so small ROIs aren't fit with hundreds of points
+    ================== ===========================================================================
+    **Arguments:**
+    rowRadius          radius of ellipse along rows
+    colRadius          radius of ellipse along columns
+
+    **Returns:**
+    numPoints          number of snake points
+    ================== ===========================================================================
+    """
+    def getSnakeResolution(self, rowRadius, colRadius):
+        a = abs(rowRadius)
+        b = abs(colRadius)
+
+        perimeter = np.pi * (3 * (a + b) - np.sqrt((3 * a + b) * (a + 3 * b)))
 
-        self.newAutoSeg.emit(snake)
+        return int(np.clip(round(perimeter * self.snakeDensity), self.minSnakePoints, self.maxSnakePoints))
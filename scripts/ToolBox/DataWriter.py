@@ -6,6 +6,7 @@ import os
 from PIL import Image
 import numpy as np
 from scripts.ToolBox.FlowToolbox import FlowToolbox
+from scripts.Helper.SparseROI import SparseROI
 from scripts.ML.LabelGenerator import LabelGenerator
 
 
@@ -124,7 +125,16 @@ class DataWriter():
 
             # let's iterate through every image in the series
             for image in series.images:
-                imgPath = os.path.join(self.fileSystem.activeDir, image.record.ReferencedFileID)
+                # images restored from the DICOM index have a path but no DICOMDir record
+                if image.path is not None:
+                    imgPath = image.path
+
+                elif image.record is not None:
+                    imgPath = os.path.join(self.fileSystem.activeDir, image.record.ReferencedFileID)
+
+                else:
+                    continue
+
                 imgPath = imgPath.replace('\\', '/')
                 imgPath = imgPath.replace('Z:/', '/ifs/loni/faculty/jpa/')
 
@@ -151,13 +161,23 @@ class DataWriter():
         if phaseSeries is None:
             return
 
-        phaseData = flowToolbox.imageROItoPhaseROI(imageROI=self.seriesGraphics.imageROI,
-                                                   imageSeries=series,
-                                                   phaseSeries=phaseSeries)
+        roi = self.getSegmentedROI()
+
+        if roi is None:
+            return
+
+        phaseData = flowToolbox.getPhaseVolume(imageSeries=series, phaseSeries=phaseSeries)
+
+        # pixels outside the roi are set to nan
+        frameIndex = self.seriesGraphics.currentIndex
+        roiMask = roi.getMask()
+
+        pixelData = phaseData[frameIndex, :, :].astype(np.float32)
+        pixelData[~(roiMask[frameIndex] if roi.isTimeResolved() else roiMask)] = np.nan
 
         np.savetxt(
             os.path.join(output_dir, file_prefix + 'pixel_intensity_matrix' + '.csv'),
-            phaseData[self.seriesGraphics.currentIndex, :, :], delimiter=",")
+            pixelData, delimiter=",")
 
     """
     Saves velocity values for phase roi ndarray
@@ -179,15 +199,39 @@ class DataWriter():
         if phaseSeries is None:
             return
 
-        phaseROI = roiAnalysis.imageROItoPhaseROI(imageROI=self.seriesGraphics.imageROI,
-                                                  imageSeries=series,
-                                                  phaseSeries=phaseSeries)
+        roi = self.getSegmentedROI()
+
+        if roi is None:
+            return
+
+        phaseROI = roiAnalysis.getPhaseVolume(imageSeries=series, phaseSeries=phaseSeries)
 
-        velocityData = roiAnalysis.getVelocityMatrix(phaseROI, series.getVenc())
+        # pixels outside the roi are set to nan
+        velocityData = roiAnalysis.getVelocityMatrix(phaseROI, series.getVenc(), roi=roi)
         np.savetxt(
             os.path.join(output_dir, file_prefix + 'velocity_matrix' + '.csv'),
             velocityData[self.seriesGraphics.currentIndex, :, :], delimiter=",")
 
+    """
+    Combines the ROIs of all segmented regions into a single ROI
+    ================== ===========================================================================
+    **Returns:**
+    roi                SparseROI covering every region (None if nothing is segmented)
+    ================== ===========================================================================
+    """
+    def getSegmentedROI(self):
+        regions = self.flowTable.regions
+
+        if not regions:
+            return None
+
+        # static masks are broadcast over the frames of time-resolved masks
+        roiMasks = np.broadcast_arrays(*[region.roi.getMask() for region in regions])
+
+        roiMask = np.logical_or.reduce(roiMasks)
+
+        return SparseROI(roiMask)
+
     """
     Saves data from flow table
     ================== ===========================================================================
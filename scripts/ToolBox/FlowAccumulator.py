@@ -0,0 +1,50 @@
+import numpy as np
+
+
+"""
+Running per frame intensity sums and pixel count of a single ROI. When the ROI changes (e.g. a stamp adds or
+removes a few pixels) only the pixels that were added or removed are read from the volume and applied to the
+sums as deltas, so refining a ROI pixel by pixel costs the size of the change rather than the size of the ROI.
+Sums are kept as integers so repeated updates don't drift.
+"""
+class FlowAccumulator:
+    def __init__(self, volume):
+        self.volume = volume
+        self.frames = volume.reshape(volume.shape[0], -1)
+
+        self.indices = np.zeros(0, dtype=np.int64)
+        self.intensitySums = np.zeros(volume.shape[0], dtype=np.int64)
+
+    """
+    Sets the accumulator to a ROI whose sums are already known
+    ================== ===========================================================================
+    **Arguments:**
+    indices            flat indices of the ROI pixels
+    intensitySums      ndarray (frames) of intensity sums of the ROI
+    ================== ===========================================================================
+    """
+    def reset(self, indices, intensitySums):
+        self.indices = indices
+        self.intensitySums = np.rint(intensitySums).astype(np.int64)
+
+    """
+    Updates the sums to match a new ROI by applying the pixels added and removed since the previous ROI
+    ================== ===========================================================================
+    **Arguments:**
+    indices            sorted flat indices of the new ROI pixels
+    ================== ===========================================================================
+    """
+    def update(self, indices):
+        addedIndices = np.setdiff1d(indices, self.indices, assume_unique=True)
+        removedIndices = np.setdiff1d(self.indices, indices, assume_unique=True)
+
+        if addedIndices.size:
+            self.intensitySums += self.frames[:, addedIndices].sum(axis=1, dtype=np.int64)
+
+        if removedIndices.size:
+            self.intensitySums -= self.frames[:, removedIndices].sum(axis=1, dtype=np.int64)
+
+        self.indices = indices
+
+    def getPixelCount(self):
+        return len(self.indices)
@@ -0,0 +1,93 @@
+from collections import OrderedDict
+import hashlib
+import numpy as np
+
+
+"""
+Process wide least recently used (LRU) cache of flow results. Results are keyed by the phase series, a fingerprint
+of the ROI and the venc (and the preset for preset measures), so redrawing a previously analysed ROI or 
+toggling between presets doesn't re-run the analysis. The least recently used results are evicted once the cache
+holds more than maxSize results.
+"""
+class FlowCache:
+    def __init__(self, maxSize=256):
+        self.maxSize = maxSize
+        self.results = OrderedDict()
+
+    """
+    Builds the cache key of a region
+    ================== ===========================================================================
+    **Arguments:**
+    series             phase series
+    roi                SparseROI
+    extra              (optional) additional key values (e.g. preset)
+
+    **Returns:**
+    key                cache key
+    ================== ===========================================================================
+    """
+    def getKey(self, series, roi, *extra):
+        seriesUID = series.images[0].metadata.seriesInstanceUID if series.images else None
+
+        # series without a UID can only be matched by identity
+        if seriesUID is None:
+            seriesUID = id(series)
+
+        return (seriesUID, self.getROIHash(roi), series.getVenc()) + extra
+
+    """
+    Fingerprints a ROI
+    ================== ===========================================================================
+    **Arguments:**
+    roi                SparseROI
+
+    **Returns:**
+    roiHash            hex digest of image shape and ROI pixel indices
+    ================== ===========================================================================
+    """
+    def getROIHash(self, roi):
+        roiHash = hashlib.blake2b(digest_size=16)
+        roiHash.update(np.asarray(roi.shape, dtype=np.int64).tobytes())
+        roiHash.update(np.asarray(roi.indices, dtype=np.int64).tobytes())
+
+        return roiHash.hexdigest()
+
+    """
+    Retrieves a cached result and marks it as most recently used
+    ================== ===========================================================================
+    **Arguments:**
+    key                cache key
+
+    **Returns:**
+    result             cached result (None if not cached)
+    ================== ===========================================================================
+    """
+    def get(self, key):
+        result = self.results.get(key)
+
+        if result is not None:
+            self.results.move_to_end(key)
+
+        return result
+
+    """
+    Stores a result, evicting the least recently used results if the cache is full
+    ================== ===========================================================================
+    **Arguments:**
+    key                cache key
+    result             result to cache
+    ================== ===========================================================================
+    """
+    def put(self, key, result):
+        self.results[key] = result
+        self.results.move_to_end(key)
+
+        while len(self.results) > self.maxSize:
+            self.results.popitem(last=False)
+
+    def clear(self):
+        self.results.clear()
+
+
+# flow cache shared by all views
+flowCache = FlowCache()
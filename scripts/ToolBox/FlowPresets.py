@@ -1,216 +1,115 @@
-from scripts.ToolBox.FlowToolbox import FlowToolbox
+from scripts.ToolBox.MeasureGraph import measureGraph
+from scripts.ToolBox.FlowCache import flowCache
 
 
 """
 Class provides analysis of flow data. By convention, positive(+) flow values indicate flow is caudo-cranial 
 (towards the head). Negative(-) flow values indicate flow in the cranio-caudal direction (away from the head). 
+
+Each preset is declared as the measures (nodes of the measure graph) it reports. Measures are computed once per
+region and shared between presets, so switching presets only looks up measures that were already computed.
+Preset measures are also kept in the flow cache, keyed by series, mask and preset.
 """
 class FlowPresets():
+    DEFAULT = 'Default'
     AQUEDUCT = 'Aqueduct'
     C2_C3_SS = 'C2-C3 SS'
     ARTERY = 'Artery'
     VEIN = 'Vein'
 
+    # preset: [(measure label, measure node)]
+    MEASURES = {
+        DEFAULT: [
+            ('ROI Area (mm^2)', 'roiArea'),
+            ('Minimum Flow (mm^3/s)', 'minFlow'),
+            ('Maximum Flow (mm^3/s)', 'maxFlow'),
+            ('Volume Displaced (mm^3)', 'volumeDisplaced')
+        ],
+        AQUEDUCT: [
+            ('ROI Area (mm^2)', 'roiArea'),
+            ('Flush Peak (mm^3/s)', 'minFlow'),
+            ('Time Flush Peak (ms)', 'timeToMinFlow'),
+            ('Fill Peak (mm^3/s)', 'maxFlow'),
+            ('Time Fill Peak (ms)', 'timeToMaxFlow'),
+            ('Stroke Volume (mm^3)', 'volumeDisplaced')
+        ],
+        C2_C3_SS: [
+            ('ROI Area (mm^2)', 'roiArea'),
+            ('Flush Peak (mm^3/s)', 'minFlow'),
+            ('Time Flush Peak (ms)', 'timeToMinFlow'),
+            ('Fill Peak (mm^3/s)', 'maxFlow'),
+            ('Time Fill Peak (ms)', 'timeToMaxFlow'),
+            ('Stroke Volume (mm^3)', 'volumeDisplaced')
+        ],
+        ARTERY: [
+            ('ROI Area (mm^2)', 'roiArea'),
+            ('Systolic Peak Flow (mm^3/s)', 'maxFlow'),
+            ('Time Systolic Peak (ms)', 'timeToMaxFlow'),
+            ('Diastolic Peak Flow (mm^3/s)', 'minFlow'),
+            ('Time Diastolic Peak (ms)', 'timeToMinFlow'),
+            ('Stroke Volume (mm^3)', 'volumeDisplaced'),
+            ('Pulse Volume (mm^3)', 'pulseVolume'),
+            ('Pulsatility (mm^3/s^2)', 'pulsatility'),
+            ('Pulsatility Index', 'pulsatilityIndex'),
+            ('Resistivity Index', 'resistivityIndex'),
+            ('Average Flow (mm^3/s)', 'averageFlow')
+        ],
+        VEIN: [
+            ('ROI Area (mm^2)', 'roiArea'),
+            ('Systolic Peak Flow (mm^3/s)', 'minFlow'),
+            ('Time Systolic Peak (ms)', 'timeToMinFlow'),
+            ('Diastolic Peak Flow (mm^3/s)', 'maxFlow'),
+            ('Time Diastolic Peak (ms)', 'timeToMaxFlow'),
+            ('Stroke Volume (mm^3)', 'volumeDisplaced'),
+            ('Average Flow (mm^3/s)', 'averageFlow')
+        ]
+    }
+
     def __init__(self, activePreset):
         self.activePreset = activePreset
 
-    def getDefaultMeasures(self, ROI, series):
-        flowToolbox = FlowToolbox()
-
-        roiArea = flowToolbox.getArea(ROI, series.images[0].getPixelArea())
-        timeData = flowToolbox.getTimeData(series.getRRInterval(), len(series.images))
-        velocityData = flowToolbox.getVelocityData(ROI, series.getVenc())
-        flowData = flowToolbox.getFlowData(velocityData, roiArea)
-        volumeDisplaced = flowToolbox.getVolumeDisplaced(timeData, flowData)
-        minFlow = flowToolbox.getMinFlow(flowData)
-        maxFlow = flowToolbox.getMaxFlow(flowData)
-
-        singleMeasures = {
-            'Preset': self.activePreset,
-            'ROI Area (mm^2)': roiArea,
-            'Minimum Flow (mm^3/s)': minFlow,
-            'Maximum Flow (mm^3/s)': maxFlow,
-            'Volume Displaced (mm^3)': volumeDisplaced
-        }
-
-        pairedMeasures = {
-            'Time (ms) : Flow (mm^3/s)': [timeData, flowData]
-        }
-
-        return singleMeasures, pairedMeasures
-
     """
-    Retreives all aqueductal measures
+    Retreives the measures of the active preset for each region. Area and flow of all regions are computed 
+    in a single pass.
     ================== ===========================================================================
     **Arguments:**
-    ROI                ROI ndarray
-    series             the series object
+    regions            segmentation regions sharing the phase volume
+    series             the phase series object
 
     **Returns:**
-    singleMeasures     measures with a single value per dictionary key
-    pairedMeasures     measures with a list of values per dictionary key
+    measures           list of [singleMeasures, pairedMeasures] for each region
+                       singleMeasures: measures with a single value per dictionary key
+                       pairedMeasures: measures with a list of values per dictionary key
     ================== ===========================================================================
     """
-    def getAqueductMeasures(self, ROI, series):
-        flowToolbox = FlowToolbox()
-
-        roiArea = flowToolbox.getArea(ROI, series.images[0].getPixelArea())
-        timeData = flowToolbox.getTimeData(series.getRRInterval(), len(series.images))
-        velocityData = flowToolbox.getVelocityData(ROI, series.getVenc())
-        flowData = flowToolbox.getFlowData(velocityData, roiArea)
-        strokeVolume = flowToolbox.getVolumeDisplaced(timeData, flowData)
-        flushPeak = flowToolbox.getMinFlow(flowData)
-        fillPeak = flowToolbox.getMaxFlow(flowData)
-        timeFlushPeak = flowToolbox.getTimeToMinFlow(timeData, flowData)
-        timeFillPeak = flowToolbox.getTimeToMaxFlow(timeData, flowData)
-
-        singleMeasures = {
-            'Preset': self.activePreset,
-            'ROI Area (mm^2)': roiArea,
-            'Flush Peak (mm^3/s)': flushPeak,
-            'Time Flush Peak (ms)': timeFlushPeak,
-            'Fill Peak (mm^3/s)': fillPeak,
-            'Time Fill Peak (ms)': timeFillPeak,
-            'Stroke Volume (mm^3)': strokeVolume
-        }
-
-        pairedMeasures = {
-            'Time (ms) : Flow (mm^3/s)': [timeData, flowData]
-        }
-
-        return singleMeasures, pairedMeasures
+    def getMeasures(self, regions, series):
+        measures = [flowCache.get(measureGraph.getCacheKey(series, region, self.activePreset)) for region in regions]
 
-    """
-    Retreives all c2-c3 measures. 
-    ================== ===========================================================================
-    **Arguments:**
-    ROI                ROI ndarray
-    series             the series object
+        uncachedRegions = [region for region, regionMeasures in zip(regions, measures) if regionMeasures is None]
 
-    **Returns:**
-    singleMeasures     measures with a single value per dictionary key
-    pairedMeasures     measures with a list of values per dictionary key
-    ================== ===========================================================================
-    """
-    def getC2C3Measures(self, ROI, series):
-        flowToolbox = FlowToolbox()
-
-        roiArea = flowToolbox.getArea(ROI, series.images[0].getPixelArea())
-        timeData = flowToolbox.getTimeData(series.getRRInterval(), len(series.images))
-        velocityData = flowToolbox.getVelocityData(ROI, series.getVenc())
-        flowData = flowToolbox.getFlowData(velocityData, roiArea)
-        strokeVolume = flowToolbox.getVolumeDisplaced(timeData, flowData)
-        flushPeak = flowToolbox.getMinFlow(flowData)
-        fillPeak = flowToolbox.getMaxFlow(flowData)
-        timeFlushPeak = flowToolbox.getTimeToMinFlow(timeData, flowData)
-        timeFillPeak = flowToolbox.getTimeToMaxFlow(timeData, flowData)
-
-        singleMeasures = {
-            'Preset': self.activePreset,
-            'ROI Area (mm^2)': roiArea,
-            'Flush Peak (mm^3/s)': flushPeak,
-            'Time Flush Peak (ms)': timeFlushPeak,
-            'Fill Peak (mm^3/s)': fillPeak,
-            'Time Fill Peak (ms)': timeFillPeak,
-            'Stroke Volume (mm^3)': strokeVolume
-        }
-
-        pairedMeasures = {
-            'Time (ms) : Flow (mm^3/s)': [timeData, flowData]
-        }
-
-        return singleMeasures, pairedMeasures
+        if not uncachedRegions:
+            return measures
 
-    """
-    Retreives all arterial measures. 
-    ================== ===========================================================================
-    **Arguments:**
-    ROI                ROI ndarray
-    series             the series object
+        measureGraph.computeFlow(series, uncachedRegions)
 
-    **Returns:**
-    singleMeasures     measures with a single value per dictionary key
-    pairedMeasures     measures with a list of values per dictionary key
-    ================== ===========================================================================
-    """
-    def getArteryMeasures(self, ROI, series):
-        flowToolbox = FlowToolbox()
-
-        roiArea = flowToolbox.getArea(ROI, series.images[0].getPixelArea())
-        timeData = flowToolbox.getTimeData(series.getRRInterval(), len(series.images))
-        velocityData = flowToolbox.getVelocityData(ROI, series.getVenc())
-        flowData = flowToolbox.getFlowData(velocityData, roiArea)
-        strokeVolume = flowToolbox.getVolumeDisplaced(timeData, flowData)
-        pulseVolume = flowToolbox.getPulseVolume(timeData, flowData)
-        systolicPeakFlow = flowToolbox.getMaxFlow(flowData)
-        timeSystolicPeak = flowToolbox.getTimeToMaxFlow(timeData, flowData)
-        diastolicPeakFlow = flowToolbox.getMinFlow(flowData)
-        timeDiastolicPeak = flowToolbox.getTimeToMinFlow(timeData, flowData)
-        pulsatility = flowToolbox.getPulsatility(timeData, flowData)
-        pulsatilityIndex = flowToolbox.getPulsatilityIndex(flowData)
-        resistivityIndex = flowToolbox.getResistivityIndex(flowData, denominator='max')
-        avgFlow = flowToolbox.getAverageFlow(flowData)
-
-        singleMeasures = {
-            'Preset': self.activePreset,
-            'ROI Area (mm^2)': roiArea,
-            'Systolic Peak Flow (mm^3/s)': systolicPeakFlow,
-            'Time Systolic Peak (ms)': timeSystolicPeak,
-            'Diastolic Peak Flow (mm^3/s)': diastolicPeakFlow,
-            'Time Diastolic Peak (ms)': timeDiastolicPeak,
-            'Stroke Volume (mm^3)': strokeVolume,
-            'Pulse Volume (mm^3)': pulseVolume,
-            'Pulsatility (mm^3/s^2)': pulsatility,
-            'Pulsatility Index': pulsatilityIndex,
-            'Resistivity Index': resistivityIndex,
-            'Average Flow (mm^3/s)': avgFlow
-        }
-
-        pairedMeasures = {
-            'Time (ms) : Flow (mm^3/s)': [timeData, flowData]
-        }
-
-        return singleMeasures, pairedMeasures
+        presetMeasures = FlowPresets.MEASURES.get(self.activePreset, FlowPresets.MEASURES[FlowPresets.DEFAULT])
 
-    """
-    Retreives all venous measures. 
-    ================== ===========================================================================
-    **Arguments:**
-    ROI                ROI ndarray
-    series             the series object
+        for index, region in enumerate(regions):
+            if measures[index] is not None:
+                continue
 
-    **Returns:**
-    singleMeasures     measures with a single value per dictionary key
-    pairedMeasures     measures with a list of values per dictionary key
-    ================== ===========================================================================
-    """
-    def getVeinMeasures(self, ROI, series):
-        flowToolbox = FlowToolbox()
-
-        roiArea = flowToolbox.getArea(ROI, series.images[0].getPixelArea())
-        timeData = flowToolbox.getTimeData(series.getRRInterval(), len(series.images))
-        velocityData = flowToolbox.getVelocityData(ROI, series.getVenc())
-        flowData = flowToolbox.getFlowData(velocityData, roiArea)
-        strokeVolume = flowToolbox.getVolumeDisplaced(timeData, flowData)
-        systolicPeakFlow = flowToolbox.getMinFlow(flowData)
-        timeSystolicPeak = flowToolbox.getTimeToMinFlow(timeData, flowData)
-        diastolicPeakFlow = flowToolbox.getMaxFlow(flowData)
-        timeDiastolicPeak = flowToolbox.getTimeToMaxFlow(timeData, flowData)
-        avgFlow = flowToolbox.getAverageFlow(flowData)
-
-        singleMeasures = {
-            'Preset': self.activePreset,
-            'ROI Area (mm^2)': roiArea,
-            'Systolic Peak Flow (mm^3/s)': systolicPeakFlow,
-            'Time Systolic Peak (ms)': timeSystolicPeak,
-            'Diastolic Peak Flow (mm^3/s)': diastolicPeakFlow,
-            'Time Diastolic Peak (ms)': timeDiastolicPeak,
-            'Stroke Volume (mm^3)': strokeVolume,
-            'Average Flow (mm^3/s)': avgFlow
-        }
-
-        pairedMeasures = {
-            'Time (ms) : Flow (mm^3/s)': [timeData, flowData]
-        }
-
-        return singleMeasures, pairedMeasures
+            singleMeasures = {'Preset': self.activePreset.lower()}
+
+            for label, node in presetMeasures:
+                singleMeasures[label] = measureGraph.get(series, region, node)
+
+            pairedMeasures = {
+                'Time (ms) : Flow (mm^3/s)': [measureGraph.get(series, region, 'timeData'),
+                                              measureGraph.get(series, region, 'flowData')]
+            }
+
+            measures[index] = [singleMeasures, pairedMeasures]
+
+            flowCache.put(measureGraph.getCacheKey(series, region, self.activePreset), measures[index])
+
+        return measures
@@ -6,63 +6,103 @@ class FlowToolbox():
         pass
 
     """
-    Converts pixel intensity to velocity
+    Converts pixel intensity to velocity. Velocities are computed in float32
     ================== ===========================================================================
     **Arguments:**
-    ROIData            ROIData ndarray
+    ROIData            image ndarray (frames, rows, cols) in native pixel dtype
     venc               venc value associated with image
+    roi                (optional) SparseROI. pixels outside the ROI are set to nan
 
     **Returns:**
-    velocityData       list of velocity values
+    velocityROI        velocity ndarray (frames, rows, cols)
     ================== ===========================================================================
     """
-    def getVelocityMatrix(self, ROIData, venc):
-        maskedROI = np.ma.masked_invalid(ROIData)
-
+    def getVelocityMatrix(self, ROIData, venc, roi=None):
         # we are assuming the image we get is a phase imageROI. phase range is 0 to 4095
-        velocityROI = (maskedROI - (4095/2)) / ((4095/2) * math.pi) * venc
+        velocityROI = (ROIData.astype(np.float32) - np.float32(4095/2)) * np.float32(venc / ((4095/2) * math.pi))
+
+        if roi is not None:
+            # static ROI masks are broadcast over every frame
+            velocityROI[~np.broadcast_to(roi.getMask(), velocityROI.shape)] = np.nan
 
         return velocityROI
 
     """
-    Converts pixel intensity to velocity
+    Calculates the per frame sum of pixel intensities of every ROI in a single vectorized pass over the image. The
+    ROI pixels of all ROIs are gathered at once and the per frame sums of each ROI are accumulated with one bincount,
+    so the cost is proportional to the total number of ROI pixels (about the same for one ROI or ten). Overlapping
+    ROIs are supported since each ROI gathers it's own pixels.
     ================== ===========================================================================
     **Arguments:**
-    ROIData            ROIData ndarray
-    venc               venc value associated with image
+    ROIData            phase ndarray (frames, rows, cols) in native pixel dtype
+    rois               list of SparseROI
 
     **Returns:**
-    velocityData       list of velocity values
+    intensitySums      ndarray (regions, frames) of intensity sums
+    pixelCounts        ndarray (regions, frames) of ROI pixel counts
     ================== ===========================================================================
     """
-    def getVelocityData(self, ROIData, venc):
-        maskedROI = np.ma.masked_invalid(ROIData)
+    def getRegionsIntensitySums(self, ROIData, rois):
+        numFrames = ROIData.shape[0]
+        numRegions = len(rois)
 
-        # we are assuming the image we get is a phase imageROI. phase range is 0 to 4095
-        maskedROI = (maskedROI - (4095/2)) / ((4095/2) * math.pi) * venc
+        pixelCounts = np.array([roi.getPixelCounts(numFrames) for roi in rois], dtype=np.int64)
+        pixelCounts = pixelCounts.reshape(numRegions, numFrames)
 
-        velocityData = maskedROI.mean(axis=(1, 2))
+        if numRegions == 0:
+            return np.zeros((0, numFrames)), pixelCounts
 
-        return velocityData
+        # flat indices of the ROI pixels of every frame. static ROIs read the same pixels in every frame
+        volumeIndices = [roi.getVolumeIndices(numFrames) for roi in rois]
+        roiLabels = np.repeat(np.arange(numRegions), [len(indices) for indices in volumeIndices])
+
+        volumeIndices = np.concatenate(volumeIndices)
+
+        # only the ROI pixels are read (native dtype)
+        pixels = ROIData.reshape(-1)[volumeIndices]
+
+        # label each pixel by (ROI, frame) so one bincount returns the sum of each (ROI, frame)
+        frameLabels = roiLabels * numFrames + volumeIndices // ROIData[0].size
+
+        sums = np.bincount(frameLabels, weights=pixels, minlength=numRegions * numFrames)
+        intensitySums = sums.reshape(numRegions, numFrames)
+
+        return intensitySums, pixelCounts
 
     """
-    Calculates area of imageROI
+    Converts per frame intensity sums of ROIs into area, mean velocity and flow
     ================== ===========================================================================
     **Arguments:**
-    ROIData            ROIData ndarray
+    intensitySums      ndarray (regions, frames) of intensity sums
+    pixelCounts        ROI pixel counts of each region. a single count (static ROI) or one count per frame
     pixelArea          physical area of pixel
-    
+    venc               venc value associated with image
+
     **Returns:**
-    roiArea            area of imageROI (mm^2)
+    roiAreas           list of ROI areas (mm^2). mean area over frames for time-resolved ROIs
+    velocityData       ndarray (regions, frames) of velocity values
+    flowData           list of flow values (mm^3/s) for each ROI
     ================== ===========================================================================
     """
-    def getArea(self, ROIData, pixelArea):
-        nonNanPixels = np.count_nonzero(~np.isnan(ROIData[0, :, :]))
-        roiArea = pixelArea * nonNanPixels
+    def getFlowDataFromSums(self, intensitySums, pixelCounts, pixelArea, venc):
+        intensitySums = np.asarray(intensitySums, dtype=np.float64).reshape(len(pixelCounts), -1)
+
+        # static ROIs have the same pixel count in every frame
+        pixelCounts = np.array([np.broadcast_to(pixelCount, intensitySums.shape[1]) for pixelCount in pixelCounts])
+        pixelCounts = pixelCounts.reshape(intensitySums.shape)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            meanIntensity = intensitySums / pixelCounts
+
+        # we are assuming the image we get is a phase imageROI. phase range is 0 to 4095
+        velocityData = (meanIntensity - (4095/2)) / ((4095/2) * math.pi) * venc
 
-        roiArea = round(roiArea, 2)
+        frameAreas = np.round(pixelArea * pixelCounts, 2)
 
-        return roiArea
+        roiAreas = [round(float(np.mean(areas)), 2) if areas.size else 0 for areas in frameAreas]
+        flowData = [self.getFlowData(velocityData[index], frameAreas[index]) for index in range(len(roiAreas))]
+
+        return roiAreas, velocityData, flowData
 
     """
     Calculates volume displaced of imageROI over 1 cardiac cycle
@@ -345,44 +385,31 @@ class FlowToolbox():
         return pulseVolume
 
     """
-    This method replaces the image imageROI with an equivalent phase imageROI. This is accomplished by 
+    Retrieves the phase volume used to calculate flow for an ROI drawn on the active series. This is accomplished by 
     finding the series in the sequence that is of type 'phase'. We'll do some basic checks to ensure the 
     shape of the images and the pixel spacing matches. However, we have to assume that all flow series within 
-    a sequence are acquired under the exact same conditions. Otherwise, this won't work.
+    a sequence are acquired under the exact same conditions. Otherwise, this won't work. The ROI applies
+    to the phase volume as is; no masked copy of the volume is made.
     ================== ===========================================================================
     **Arguments:**
-    imageROI           image roi ndarray
     imageSeries        active series
     phaseSeries        series within same sequence as active series that has phase information
 
     **Returns:**
-    phaseROI           phase roi ndarray
+    phaseVolume        phase ndarray (frames, rows, cols) in native pixel dtype
     ================== ===========================================================================
     """
-    def imageROItoPhaseROI(self, imageROI, imageSeries, phaseSeries):
+    def getPhaseVolume(self, imageSeries, phaseSeries):
         if phaseSeries is None:
             return
 
-        images = []
-
-        for image in phaseSeries.images:
-            images.append(image.pixel_array)
-
-        phaseROI = np.array(images)
+        phaseVolume = phaseSeries.getVolume()
 
-        shapeMismatchFlag = (phaseROI.shape != imageROI.shape)
+        shapeMismatchFlag = (phaseVolume.shape != imageSeries.getVolume().shape)
         pixelAreaMismatchFlag = (phaseSeries.images[0].getPixelArea() != imageSeries.images[0].getPixelArea())
 
         # do the series match in shape and pixel area? this is important for future analysisWidget
         if shapeMismatchFlag or pixelAreaMismatchFlag:
             return None
 
-        imageROI = np.copy(imageROI)
-
-        # set all non nan numbers to 1
-        imageROI[~np.isnan(imageROI)] = 1
-
-        # this is essentially an identity operation with the non roi region being set to nan
-        phaseROI = phaseROI * imageROI
-
-        return phaseROI
+        return phaseVolume
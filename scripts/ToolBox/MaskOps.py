@@ -0,0 +1,151 @@
+import numpy as np
+import cv2 as cv
+
+
+"""
+Array level morphological operations on 2D masks. A structuring element is given as a list of (row, col) offsets
+(or built from a kernel with getKernelOffsets), so the operations work for any kernel shape. Pixels outside the
+mask are treated as 0.
+"""
+class MaskOps:
+    # offsets of the 2x2 kernel anchored at it's top left pixel
+    LOWER_RIGHT = ((1, 0), (0, 1), (1, 1))
+
+    """
+    Retrieves the offsets of the nonzero elements of a kernel relative to it's center
+    ================== ===========================================================================
+    **Arguments:**
+    kernel             2D ndarray
+    center             (row, col) of kernel center
+
+    **Returns:**
+    offsets            list of (row, col) offsets
+    ================== ===========================================================================
+    """
+    def getKernelOffsets(self, kernel, center):
+        return [(row - center[0], col - center[1]) for row, col in np.argwhere(kernel)]
+
+    """
+    Shifts a mask by an offset. Pixels shifted in from outside the mask are set to fill
+    ================== ===========================================================================
+    **Arguments:**
+    mask               2D boolean ndarray
+    offset             (row, col) offset. shifted[row + dRow, col + dCol] = mask[row, col]
+    fill               value of pixels shifted in from outside the mask
+
+    **Returns:**
+    shifted            2D boolean ndarray
+    ================== ===========================================================================
+    """
+    def shift(self, mask, offset, fill=False):
+        dRow, dCol = offset
+        rows, cols = mask.shape
+
+        shifted = np.full(mask.shape, fill, dtype=bool)
+
+        if abs(dRow) >= rows or abs(dCol) >= cols:
+            return shifted
+
+        shifted[max(dRow, 0):rows + min(dRow, 0), max(dCol, 0):cols + min(dCol, 0)] = \
+            mask[max(-dRow, 0):rows + min(-dRow, 0), max(-dCol, 0):cols + min(-dCol, 0)]
+
+        return shifted
+
+    """
+    Dilates a mask (shifted OR). Every pixel at (row + dRow, col + dCol) of a nonzero pixel (row, col) is set to
+    value if it is 0. Nonzero pixels are left unchanged.
+    ================== ===========================================================================
+    **Arguments:**
+    mask               2D ndarray
+    offsets            list of (row, col) offsets
+    value              (optional) value of the added pixels
+
+    **Returns:**
+    dilatedMask        2D ndarray (same dtype as mask)
+    ================== ===========================================================================
+    """
+    def dilate(self, mask, offsets, value=1):
+        nonzero = mask != 0
+
+        dilated = np.copy(nonzero)
+
+        for offset in offsets:
+            dilated |= self.shift(nonzero, offset)
+
+        dilatedMask = np.copy(mask)
+        dilatedMask[dilated & ~nonzero] = value
+
+        return dilatedMask
+
+    """
+    Erodes a mask (shifted AND). A nonzero pixel (row, col) is set to 0 if any pixel at (row + dRow, col + dCol)
+    is 0. Pixels outside the mask are 0.
+    ================== ===========================================================================
+    **Arguments:**
+    mask               2D ndarray
+    offsets            list of (row, col) offsets
+
+    **Returns:**
+    erodedMask         2D ndarray (same dtype as mask)
+    ================== ===========================================================================
+    """
+    def erode(self, mask, offsets):
+        nonzero = mask != 0
+
+        eroded = np.copy(nonzero)
+
+        for dRow, dCol in offsets:
+            # neighbor (row + dRow, col + dCol) is moved onto (row, col)
+            eroded &= self.shift(nonzero, (-dRow, -dCol))
+
+        erodedMask = np.copy(mask)
+        erodedMask[nonzero & ~eroded] = 0
+
+        return erodedMask
+
+    """
+    Finds the contours of a mask as rectilinear paths. findContours connects pixels with diagonal segments,
+    which don't make sense for a pixel mask (a pixel can't be half filled), so a corner point is inserted for
+    every diagonal step making the path follow the pixel edges horizontally/vertically.
+    ================== ===========================================================================
+    **Arguments:**
+    mask               2D uint8 ndarray
+
+    **Returns:**
+    contours           list of Nx2 ndarrays of (x, y) points
+    ================== ===========================================================================
+    """
+    def getRectilinearContours(self, mask):
+        contours, hierarchy = cv.findContours(image=mask, mode=cv.RETR_TREE, method=cv.CHAIN_APPROX_NONE)
+
+        return [self.toRectilinear(contour.reshape(-1, 2)) for contour in contours]
+
+    """
+    Replaces each diagonal step of a contour with a horizontal and a vertical step
+    ================== ===========================================================================
+    **Arguments:**
+    points             Nx2 ndarray of (x, y) points. consecutive points are at most 1 pixel apart
+
+    **Returns:**
+    points             Mx2 ndarray of (x, y) points
+    ================== ===========================================================================
+    """
+    def toRectilinear(self, points):
+        delta = np.diff(points, axis=0)
+        diagonal = np.flatnonzero((delta[:, 0] != 0) & (delta[:, 1] != 0))
+
+        if not diagonal.size:
+            return points
+
+        prevPoints = points[diagonal]
+        currPoints = points[diagonal + 1]
+
+        # corner at (prevX, y) when x and y move in opposite directions, (x, prevY) otherwise
+        opposite = (delta[diagonal, 0] * delta[diagonal, 1] < 0)[:, None]
+
+        corners = np.where(opposite,
+                           np.column_stack((prevPoints[:, 0], currPoints[:, 1])),
+                           np.column_stack((currPoints[:, 0], prevPoints[:, 1])))
+
+        # corners go between the previous and current point
+        return np.insert(points, diagonal + 1, corners, axis=0)
@@ -0,0 +1,226 @@
+import weakref
+
+from scripts.ToolBox.FlowToolbox import FlowToolbox
+from scripts.ToolBox.FlowCache import flowCache
+from scripts.ToolBox.FlowAccumulator import FlowAccumulator
+
+
+"""
+Dependency graph of flow measures. Each measure (node) is computed from the nodes it depends on and memoized per
+(series, region), so a measure is only ever computed once no matter how many views or presets request it.
+Area, velocity and flow are computed for all regions of a bundle in a single pass (see
+FlowToolbox.getRegionsIntensitySums). Memoized values are released with their region; area, velocity and flow are
+also kept in the flow cache so a region with the same mask is a cache hit.
+
+Running intensity sums are kept per region id (see FlowAccumulator). When a region with the same id is redrawn
+(e.g. stamping), only the pixels added or removed since the previous version of the region are read. Time-resolved
+ROIs are always computed in a single pass.
+"""
+class MeasureGraph:
+    # nodes computed for all regions at once
+    FLOW_NODES = ('roiArea', 'velocityData', 'flowData')
+
+    # node: (function(flowToolbox, *dependencies), dependencies)
+    NODES = {
+        'volumeDisplaced': (lambda toolbox, timeData, flowData: toolbox.getVolumeDisplaced(timeData, flowData),
+                            ('timeData', 'flowData')),
+        'minFlow': (lambda toolbox, flowData: toolbox.getMinFlow(flowData),
+                    ('flowData',)),
+        'maxFlow': (lambda toolbox, flowData: toolbox.getMaxFlow(flowData),
+                    ('flowData',)),
+        'timeToMinFlow': (lambda toolbox, timeData, flowData: toolbox.getTimeToMinFlow(timeData, flowData),
+                          ('timeData', 'flowData')),
+        'timeToMaxFlow': (lambda toolbox, timeData, flowData: toolbox.getTimeToMaxFlow(timeData, flowData),
+                          ('timeData', 'flowData')),
+        'pulseVolume': (lambda toolbox, timeData, flowData: toolbox.getPulseVolume(timeData, flowData),
+                        ('timeData', 'flowData')),
+        'pulsatility': (lambda toolbox, timeData, flowData: toolbox.getPulsatility(timeData, flowData),
+                        ('timeData', 'flowData')),
+        'pulsatilityIndex': (lambda toolbox, flowData: toolbox.getPulsatilityIndex(flowData),
+                             ('flowData',)),
+        'resistivityIndex': (lambda toolbox, flowData: toolbox.getResistivityIndex(flowData, denominator='max'),
+                             ('flowData',)),
+        'averageFlow': (lambda toolbox, flowData: toolbox.getAverageFlow(flowData),
+                        ('flowData',))
+    }
+
+    def __init__(self):
+        self.flowToolbox = FlowToolbox()
+
+        # region -> series -> node -> value
+        self.values = weakref.WeakKeyDictionary()
+
+        # series -> time data
+        self.timeData = weakref.WeakKeyDictionary()
+
+        # series -> region id -> FlowAccumulator
+        self.accumulators = weakref.WeakKeyDictionary()
+
+    """
+    Retrieves the memoized values of a region for a series
+    ================== ===========================================================================
+    **Arguments:**
+    series             phase series
+    region             segmentation region
+
+    **Returns:**
+    values             dictionary of node: value
+    ================== ===========================================================================
+    """
+    def getValues(self, series, region):
+        regionValues = self.values.setdefault(region, {})
+
+        return regionValues.setdefault(series, {})
+
+    """
+    Computes the area, velocity and flow of every region that doesn't have them yet. Regions sharing the same
+    phase volume are computed together in a single pass.
+    ================== ===========================================================================
+    **Arguments:**
+    series             phase series
+    regions            list of segmentation regions
+    ================== ===========================================================================
+    """
+    def computeFlow(self, series, regions):
+        seriesAccumulators = self.accumulators.setdefault(series, {})
+
+        updatedRegions = []
+        intensitySums = []
+        pixelCounts = []
+
+        regionsByVolume = {}
+
+        for region in regions:
+            values = self.getValues(series, region)
+
+            if 'flowData' in values:
+                continue
+
+            cachedFlow = flowCache.get(self.getCacheKey(series, region))
+
+            if cachedFlow is not None:
+                values['roiArea'], values['velocityData'], values['flowData'] = cachedFlow
+
+                continue
+
+            accumulator = seriesAccumulators.get(region.id)
+
+            # a previous version of this region exists. apply the change only (static ROIs only)
+            if accumulator is not None and accumulator.volume is region.image and not region.roi.isTimeResolved():
+                accumulator.update(region.roi.indices)
+
+                updatedRegions.append(region)
+                intensitySums.append(accumulator.intensitySums)
+                pixelCounts.append(accumulator.getPixelCount())
+
+            else:
+                regionsByVolume.setdefault(id(region.image), []).append(region)
+
+        # new regions are computed together in a single pass
+        for _regions in regionsByVolume.values():
+            _intensitySums, _pixelCounts = self.flowToolbox.getRegionsIntensitySums(_regions[0].image,
+                                                                                    [region.roi for region in _regions])
+
+            for index, region in enumerate(_regions):
+                # time-resolved ROIs don't have a single set of indices to apply changes to
+                if region.roi.isTimeResolved():
+                    seriesAccumulators.pop(region.id, None)
+
+                else:
+                    accumulator = FlowAccumulator(region.image)
+                    accumulator.reset(region.roi.indices, _intensitySums[index])
+
+                    seriesAccumulators[region.id] = accumulator
+
+                updatedRegions.append(region)
+                intensitySums.append(_intensitySums[index])
+                pixelCounts.append(_pixelCounts[index])
+
+        if not updatedRegions:
+            return
+
+        roiAreas, velocityData, flowData = self.flowToolbox.getFlowDataFromSums(
+            intensitySums,
+            pixelCounts,
+            series.images[0].getPixelArea(),
+            series.getVenc())
+
+        for index, region in enumerate(updatedRegions):
+            values = self.getValues(series, region)
+
+            values['roiArea'] = roiAreas[index]
+            values['velocityData'] = velocityData[index]
+            values['flowData'] = flowData[index]
+
+            flowCache.put(self.getCacheKey(series, region),
+                          (roiAreas[index], velocityData[index], flowData[index]))
+
+    """
+    Retrieves the flow cache key of a region. The mask fingerprint is memoized with the region
+    ================== ===========================================================================
+    **Arguments:**
+    series             phase series
+    region             segmentation region
+    extra              (optional) additional key values (e.g. preset)
+
+    **Returns:**
+    key                cache key
+    ================== ===========================================================================
+    """
+    def getCacheKey(self, series, region, *extra):
+        values = self.getValues(series, region)
+
+        if 'cacheKey' not in values:
+            values['cacheKey'] = flowCache.getKey(series, region.roi)
+
+        return values['cacheKey'] + extra
+
+    """
+    Retrieves the time data of a series
+    ================== ===========================================================================
+    **Arguments:**
+    series             phase series
+
+    **Returns:**
+    timeData           list of time values (ms)
+    ================== ===========================================================================
+    """
+    def getTimeData(self, series):
+        if series not in self.timeData:
+            self.timeData[series] = self.flowToolbox.getTimeData(series.getRRInterval(), len(series.images))
+
+        return self.timeData[series]
+
+    """
+    Retrieves a measure of a region. The measure (and any measure it depends on) is computed if it hasn't been yet
+    ================== ===========================================================================
+    **Arguments:**
+    series             phase series
+    region             segmentation region
+    node               name of the measure
+
+    **Returns:**
+    value              value of the measure
+    ================== ===========================================================================
+    """
+    def get(self, series, region, node):
+        if node == 'timeData':
+            return self.getTimeData(series)
+
+        values = self.getValues(series, region)
+
+        if node not in values:
+            if node in MeasureGraph.FLOW_NODES:
+                self.computeFlow(series, [region])
+
+            else:
+                function, dependencies = MeasureGraph.NODES[node]
+
+                values[node] = function(self.flowToolbox, *[self.get(series, region, dependency)
+                                                            for dependency in dependencies])
+
+        return values[node]
+
+
+# measure graph shared by all views
+measureGraph = MeasureGraph()
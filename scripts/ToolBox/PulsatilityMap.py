@@ -0,0 +1,90 @@
+from scipy import ndimage
+import numpy as np
+
+
+"""
+Finds vessel candidates from the temporal behaviour of each pixel of a phase series. Pixels inside a vessel pulse
+with the cardiac cycle, so their phase varies a lot over the cine and most of that variation is at the heart rate
+(one cycle per cine, since the cine covers one RR interval). Static tissue and noise don't. Pixels are scored on
+their temporal standard deviation, peak-to-peak range and spectral power at the heart rate. The high scoring pixels
+are grouped into connected components and the components are ranked by their total score.
+
+Velocity is linear in phase intensity, so the statistics are computed on the intensities directly. The ranking is
+the same as for velocities.
+"""
+class PulsatilityMap:
+    def __init__(self, threshold=3, minPixels=4, maxCandidates=5):
+        # pixels scoring more than threshold standard deviations above the mean score are candidate pixels
+        self.threshold = threshold
+
+        # smaller components are noise
+        self.minPixels = minPixels
+
+        self.maxCandidates = maxCandidates
+
+    """
+    Computes the pulsatility score of every pixel in a single vectorized pass over the volume
+    ================== ===========================================================================
+    **Arguments:**
+    volume             ndarray (frames, ...) in native pixel dtype
+
+    **Returns:**
+    score              float32 ndarray of the frame shape. each statistic is normalized by it's
+                       maximum and the score is their mean (0 to 1)
+    ================== ===========================================================================
+    """
+    def getScore(self, volume):
+        numFrames = volume.shape[0]
+
+        frames = volume.reshape(numFrames, -1).astype(np.float32)
+
+        std = frames.std(axis=0)
+        peakToPeak = frames.max(axis=0) - frames.min(axis=0)
+
+        # power of the first harmonic (one cycle per cine). only this DFT bin is needed, so it's computed with two
+        # dot products instead of a full FFT along time
+        phase = 2 * np.pi * np.arange(numFrames) / numFrames
+        power = (np.cos(phase).astype(np.float32) @ frames) ** 2 + (np.sin(phase).astype(np.float32) @ frames) ** 2
+
+        score = np.zeros(frames.shape[1], dtype=np.float32)
+
+        for statistic in (std, peakToPeak, power):
+            maximum = statistic.max()
+
+            if maximum > 0:
+                score += statistic / maximum
+
+        score /= 3
+
+        return score.reshape(volume.shape[1:])
+
+    """
+    Finds the vessel candidates of a volume
+    ================== ===========================================================================
+    **Arguments:**
+    volume             ndarray (frames, ...) in native pixel dtype
+
+    **Returns:**
+    candidates         list of boolean masks of the frame shape, ranked from most to least likely
+    ================== ===========================================================================
+    """
+    def getCandidates(self, volume):
+        if volume.shape[0] < 2:
+            return []
+
+        score = self.getScore(volume)
+
+        labels, numLabels = ndimage.label(score > score.mean() + self.threshold * score.std())
+
+        if numLabels == 0:
+            return []
+
+        # pixel count and total score of each component (label 0 is background)
+        pixelCounts = np.bincount(labels.ravel(), minlength=numLabels + 1)[1:]
+        labelScores = np.bincount(labels.ravel(), weights=score.ravel(), minlength=numLabels + 1)[1:]
+
+        # rank by total score so large, strongly pulsing components come first
+        labelScores[pixelCounts < self.minPixels] = -1
+        ranking = np.argsort(labelScores)[::-1][:self.maxCandidates]
+
+        return [labels == index + 1 for index in ranking if labelScores[index] >= 0]
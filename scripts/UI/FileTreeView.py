@@ -1,17 +1,27 @@
 from PyQt5.QtWidgets import QFileSystemModel, QTreeView, QPushButton, QWidget, QHBoxLayout, QVBoxLayout, QFrame
-from PyQt5.QtCore import Qt, QSize, pyqtSignal
+from PyQt5.QtCore import Qt, QSize, pyqtSignal, QThreadPool
 from PyQt5.QtGui import QIcon
+import logging
 
 from scripts.DICOM.DICOMReader import DICOMReader
+from scripts.DICOM.DecodePool import DecodePool
+from scripts.DICOM.DICOMIndex import DICOMIndex
+from scripts.DICOM.VolumeCache import VolumeCache
 from scripts.DICOM.Patient import Patient
+from scripts.Helper.Worker import Worker
 from scripts.Helper.Resources import *
 
 
+logger = logging.getLogger(__name__)
+
+
 """
 Widget used as a container for the file system and tree view.
 """
 class FileTreeView(QWidget):
     patientLoaded = pyqtSignal(Patient)
+    seriesLoaded = pyqtSignal(object)
+    loadProgress = pyqtSignal(object)
 
     def __init__(self, parent):
         super().__init__()
@@ -32,6 +42,23 @@ class FileTreeView(QWidget):
 
         self.activeDir = None
 
+        # patients are loaded on a worker thread. only the most recent load is kept
+        self.loadWorker = None
+        self.loadPath = None
+        self.loadedPatient = None
+
+        # worker pool shared by all loaded patients for decoding pixel data. 0 workers uses all cores.
+        # lean memory mode strips raw pixel data from the datasets once it is decoded
+        self.decodePool = DecodePool(mode=appSettings.value('decodeMode', DecodePool.AUTO),
+                                     workers=int(appSettings.value('decodeWorkers', 0)),
+                                     lean=appSettings.value('leanMemory', False, type=bool))
+
+        # index of previously opened DICOMDir files. re-opening a patient skips header parsing
+        self.dicomIndex = DICOMIndex()
+
+        # series volumes are memory-mapped from disk if a volume cache directory is configured
+        self.volumeCache = VolumeCache(appSettings.value('volumeCacheDir', '') or None)
+
         self.initUI()
 
         self.tree.doubleClicked.connect(self.checkSelection)
@@ -147,41 +174,161 @@ class FileTreeView(QWidget):
         self.activeDir = os.path.dirname(filePath)
 
     """
-    Opens selected DICOMDir file.
+    Opens selected DICOMDir file. The patient is loaded on a worker thread.
     ================== ===========================================================================
     **Arguments:**
-    index              tree double clicked event returns an index. index can then be 
-                       converted to filepath
-    
-    **Signal:**
-    patientLoaded      returns patient
+    DICOMDirPath       file path of DICOMDir file
     ================== ===========================================================================
     """
     def openDICOMDir(self, DICOMDirPath):
         if os.path.isfile(DICOMDirPath):
-            self.dicomReader = DICOMReader()
-
-            patient = self.dicomReader.load_patient_record(DICOMDirPath)
-
-            if patient is None:
+            # this patient is already loading. ignore repeated clicks
+            if self.loadWorker is not None and self.loadPath == DICOMDirPath:
                 return
 
-            self.patientLoaded.emit(patient)
+            self.dicomReader = DICOMReader(self.decodePool, self.dicomIndex, self.volumeCache)
+
+            self.startLoad(DICOMDirPath, self.dicomReader.load_patient_record)
 
             # self.activeDir = os.path.dirname(DICOMDirPath)
 
     def parseDir(self, dirPath):
         if os.path.isdir(dirPath):
-            self.dicomReader = DICOMReader()
+            if self.loadWorker is not None and self.loadPath == dirPath:
+                return
 
-            patient = self.dicomReader.try_parse_dir(dirPath)
+            self.dicomReader = DICOMReader(self.decodePool, volumeCache=self.volumeCache)
 
-            if patient is None:
-                return
+            self.startLoad(dirPath, self.dicomReader.try_parse_dir)
 
+            # self.activeDir = dirPath
+
+    """
+    Cancels any patient that is currently loading and starts loading a new patient on a worker thread.
+    ================== ===========================================================================
+    **Arguments:**
+    path               file path of DICOMDir file or directory of DICOM images
+    loadFunction       DICOMReader function used to load the patient
+    ================== ===========================================================================
+    """
+    def startLoad(self, path, loadFunction):
+        self.cancelLoad()
+
+        worker = Worker(loadFunction, path)
+        worker.kwargs = {
+            'progress': lambda loadProgress: worker.emitProgress(self.formatProgress(loadProgress)),
+            'seriesLoaded': lambda *loaded: worker.signals.partial.emit(loaded),
+            'isCancelled': worker.isCancelled
+        }
+
+        worker.signals.progress.connect(lambda text, worker=worker: self.onLoadProgress(worker, text))
+        worker.signals.partial.connect(lambda loaded, worker=worker: self.onSeriesLoaded(worker, loaded))
+        worker.signals.result.connect(lambda patient, worker=worker: self.onLoadFinished(worker, patient))
+        worker.signals.error.connect(lambda error, worker=worker: self.onLoadError(worker, error))
+        worker.signals.finished.connect(lambda worker=worker: self.onWorkerFinished(worker))
+
+        self.loadWorker = worker
+        self.loadPath = path
+        self.loadedPatient = None
+
+        self.loadProgress.emit("Loading patient...")
+
+        QThreadPool.globalInstance().start(worker)
+
+    """
+    Cancels the patient that is currently loading (if any)
+    """
+    def cancelLoad(self):
+        if self.loadWorker is None:
+            return
+
+        self.loadWorker.cancel()
+
+        self.loadWorker = None
+        self.loadPath = None
+        self.loadedPatient = None
+
+        self.loadProgress.emit("")
+
+    """
+    Formats patient load progress. Called on the worker thread.
+    ================== ===========================================================================
+    **Arguments:**
+    loadProgress       LoadProgress of DICOMReader
+
+    **Returns:**
+    text               progress text
+    ================== ===========================================================================
+    """
+    def formatProgress(self, loadProgress):
+        return "Loading patient: %d series, %d images, %.1f MB" % (loadProgress.seriesFound,
+                                                                   loadProgress.imagesRead,
+                                                                   loadProgress.bytesRead / 1024 ** 2)
+
+    def onLoadProgress(self, worker, text):
+        if worker is not self.loadWorker:
+            return
+
+        self.loadProgress.emit(text)
+
+    """
+    Called when a series has been loaded. The patient is emitted as soon as the first series is available.
+    Subsequent series are emitted individually as they become available.
+    ================== ===========================================================================
+    **Arguments:**
+    worker             worker loading the patient
+    loaded             (patient, study, series)
+
+    **Signal:**
+    patientLoaded      returns patient
+    seriesLoaded       returns (patient, study, series)
+    ================== ===========================================================================
+    """
+    def onSeriesLoaded(self, worker, loaded):
+        if worker is not self.loadWorker:
+            return
+
+        patient, study, series = loaded
+
+        if self.loadedPatient is not patient:
+            self.loadedPatient = patient
             self.patientLoaded.emit(patient)
 
-            # self.activeDir = dirPath
+        else:
+            self.seriesLoaded.emit(loaded)
+
+    def onLoadFinished(self, worker, patient):
+        if worker is not self.loadWorker:
+            return
+
+        if patient is None:
+            self.loadProgress.emit("")
+
+            return
+
+        # patient without any series
+        if self.loadedPatient is not patient:
+            self.loadedPatient = patient
+            self.patientLoaded.emit(patient)
+
+        numSeries = sum(len(study.series) for study in patient.studies)
+
+        self.loadProgress.emit("Loaded patient: %d series" % numSeries)
+
+    def onLoadError(self, worker, error):
+        if worker is not self.loadWorker:
+            return
+
+        logger.error("Failed to load patient\n%s", error)
+
+        self.loadProgress.emit("Failed to load patient")
+
+    def onWorkerFinished(self, worker):
+        if worker is not self.loadWorker:
+            return
+
+        self.loadWorker = None
+        self.loadPath = None
 
     def resizeEvent(self, event):
         self.tree.resize(self.frameGeometry().width(), self.frameGeometry().height())
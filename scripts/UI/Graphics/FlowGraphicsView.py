@@ -5,6 +5,7 @@ from PyQt5.QtGui import QColor, QPen
 from PyQt5 import Qt
 
 from scripts.ToolBox.FlowToolbox import FlowToolbox
+from scripts.ToolBox.MeasureGraph import measureGraph
 
 
 """
@@ -101,10 +102,9 @@ class FlowGraphicsView(pg.PlotWidget):
             return
 
         for region in regions:
-            # Need to convert the image ROIData to phase ROIData. This is necessary because flow can only be
-            # calculated off the phase image, not the magnitude or complex difference image.
-            region.image = flowToolbox.imageROItoPhaseROI(imageROI=region.image, imageSeries=self.series,
-                                                      phaseSeries=phaseSeries)
+            # Need to swap the image volume for the phase volume. This is necessary because flow can only be
+            # calculated off the phase image, not the magnitude or complex difference image. The ROI mask is unchanged
+            region.image = flowToolbox.getPhaseVolume(imageSeries=self.series, phaseSeries=phaseSeries)
 
         self.series = phaseSeries
 
@@ -141,16 +141,21 @@ class FlowGraphicsView(pg.PlotWidget):
     Displays a plot of flow data
     ================== ===========================================================================
     **Arguments:**
-    ROI                ROI ndarray
+    regions            segmentation regions sharing the phase volume
     ================== ===========================================================================
     """
     def plot(self, regions):
-        flowToolbox = FlowToolbox()
-
         self.clearPlot()
 
         self.plotItem.scene().sigMouseMoved.connect(self.onMouseMove)
 
+        # regions share the phase volume
+        if regions[0].image is None:
+            return
+
+        # flow of every region is calculated in a single pass. it is memoized per region and shared with the flow table
+        measureGraph.computeFlow(self.series, regions)
+
         for index, region in enumerate(regions):
             plotDataItem = PlotDataItem(self)
 
@@ -159,12 +164,8 @@ class FlowGraphicsView(pg.PlotWidget):
             plotDataItem.linePen.setColor(color)
             plotDataItem.symbolPen.setColor(color)
 
-            ROI = region.image
-
-            area = flowToolbox.getArea(ROI, self.series.images[0].getPixelArea())
-            timeData = flowToolbox.getTimeData(self.series.getRRInterval(), len(self.series.images))
-            velocityData = flowToolbox.getVelocityData(ROI, self.series.getVenc())
-            flowData = flowToolbox.getFlowData(velocityData, area)
+            timeData = measureGraph.get(self.series, region, 'timeData')
+            flowData = measureGraph.get(self.series, region, 'flowData')
 
             plotDataItem.setData(np.array(timeData), np.array(flowData))
             self.plotItem.addItem(plotDataItem)
@@ -1,5 +1,5 @@
 from PyQt5.QtWidgets import QGraphicsObject
-from PyQt5.QtCore import pyqtSignal
+from PyQt5.QtCore import pyqtSignal, QTimer
 from pyqtgraph.GraphicsScene import mouseEvents
 import numpy as np
 import math
@@ -22,6 +22,13 @@ class KernelGraphics(QGraphicsObject):
 
         self.enabled = False
 
+        # stamps made while dragging are coalesced so the downstream refresh (contours, flow table, plots)
+        # runs at most once per interval instead of on every mouse move
+        self.dragStampInterval = 100
+        self.dragStampTimer = QTimer()
+        self.dragStampTimer.setSingleShot(True)
+        self.dragStampTimer.timeout.connect(self.emitStamp)
+
     def subscribe(self):
         self.unsubscribe()
 
@@ -96,20 +103,29 @@ class KernelGraphics(QGraphicsObject):
                 else:
                     self.eraseMode = False
 
-            if ev.isFinish():
-                self.newStamp.emit(self.maskItem.image)
-
             if self.eraseMode:
                 self.maskItem.image[(i - bound_1):(i + bound_2), (j - bound_1):(j + bound_2)] = 0
             else:
                 self.maskItem.drawAt(viewPos, ev)
 
+            # the analysis follows the drag at a throttled rate. the final stamp is always emitted on release
+            if ev.isFinish():
+                self.dragStampTimer.stop()
+                self.emitStamp()
+
+            elif not self.dragStampTimer.isActive():
+                self.dragStampTimer.start(self.dragStampInterval)
+
         elif type(ev) == mouseEvents.MouseClickEvent:
             if val == 1:
                 self.maskItem.image[(i - bound_1):(i + bound_2), (j - bound_1):(j + bound_2)] = 0
             else:
                 self.maskItem.drawAt(viewPos, ev)
 
-            self.newStamp.emit(self.maskItem.image)
+            self.dragStampTimer.stop()
+            self.emitStamp()
 
         self.maskItem.updateImage()
+
+    def emitStamp(self):
+        self.newStamp.emit(self.maskItem.image)
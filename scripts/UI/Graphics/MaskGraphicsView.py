@@ -9,6 +9,7 @@ from PyQt5.QtWidgets import QFrame, QHBoxLayout
 from scripts.UI.Graphics.KernelGraphics import KernelGraphics
 from scripts.UI.Cursor import Cursor
 from scripts.Helper.SegmentationRegion import SegmentationRegion
+from scripts.ToolBox.MaskOps import MaskOps
 
 
 """
@@ -38,6 +39,8 @@ class MaskGraphicsView(PGGraphicsView):
 
         self.mask = None
 
+        self.maskOps = MaskOps()
+
         self.initUI()
 
     def initUI(self):
@@ -107,14 +110,10 @@ class MaskGraphicsView(PGGraphicsView):
 
             return
 
-        images = []
-
-        for image in series.images:
-            images.append(image.pixel_array.T)
+        volume = series.getVolume()
 
-        images = np.array(images)
-
-        mask = np.zeros((images.shape[1], images.shape[2]))
+        # mask is in column-major order (col, row) to match the series graphics
+        mask = np.zeros((volume.shape[2], volume.shape[1]))
 
         self.maskItem.setImage(mask)
         self.view.addItem(self.maskItem)
@@ -135,21 +134,8 @@ class MaskGraphicsView(PGGraphicsView):
     def newStamp(self, mask):
         self.mask = Mask()
 
-        # adjust emitted mask
-        adjustedMask = np.copy(mask)
-        non_zero_indexes = np.nonzero(adjustedMask)
-        nonzero_row = non_zero_indexes[0]
-        nonzero_col = non_zero_indexes[1]
-
-        for row, col in zip(nonzero_row, nonzero_col):
-            if adjustedMask[row + 1, col] == 0:
-                adjustedMask[row + 1, col] = 1
-
-            if adjustedMask[row, col + 1] == 0:
-                adjustedMask[row, col + 1] = 1
-
-            if adjustedMask[row + 1, col + 1] == 0:
-                adjustedMask[row + 1, col + 1] = 1
+        # adjust emitted mask. pixels (row + 1, col), (row, col + 1) and (row + 1, col + 1) are added
+        adjustedMask = self.maskOps.dilate(mask, MaskOps.LOWER_RIGHT)
 
         _region = SegmentationRegion()
         _region.mask = adjustedMask
@@ -175,30 +161,16 @@ class MaskGraphicsView(PGGraphicsView):
         self.mask = Mask()
 
         for region in overlay.regions:
-            regionVertices = region.vertices
-
-            regionCoordinates = [tuple([vertice.x(), vertice.y()]) for vertice in regionVertices]
+            regionCoordinates = region.vertices.getCoordinates()
             regionMask = Image.new('L', imageShape)
 
             ImageDraw.Draw(regionMask).polygon(regionCoordinates, outline=1, fill=1)
 
             regionMask = np.array(regionMask).T
 
-            # adjust displayed mask to match overlay
-            adjustedMask = np.copy(regionMask)
-            non_zero_indexes = np.nonzero(adjustedMask)
-            nonzero_row = non_zero_indexes[0]
-            nonzero_col = non_zero_indexes[1]
-
-            for row, col in zip(nonzero_row, nonzero_col):
-                if adjustedMask[row + 1, col] == 0:
-                    adjustedMask[row, col] = 0
-
-                if adjustedMask[row, col + 1] == 0:
-                    adjustedMask[row, col] = 0
-
-                if adjustedMask[row + 1, col + 1] == 0:
-                    adjustedMask[row, col] = 0
+            # adjust displayed mask to match overlay. pixels missing a (row + 1, col), (row, col + 1) or
+            # (row + 1, col + 1) neighbor are removed
+            adjustedMask = self.maskOps.erode(regionMask, MaskOps.LOWER_RIGHT)
 
             overallMask = adjustedMask + overallMask
 
@@ -217,7 +189,7 @@ class MaskGraphicsView(PGGraphicsView):
     Updates the mask to match the overlay. Overlay is assumed to be in image item coordinates.
     ================== ===========================================================================
     **Arguments:**
-    vertices           A list of tuples containing vertices from autosegmentation routine
+    vertices           Nx2 int ndarray of vertices from autosegmentation routine
     ================== ===========================================================================
     """
     def newAutoSeg(self, vertices):
@@ -229,7 +201,7 @@ class MaskGraphicsView(PGGraphicsView):
 
         overallMask = np.empty(imageShape)
 
-        autoSegCoordinates = [tuple(vertice) for vertice in vertices]
+        autoSegCoordinates = [tuple(vertice) for vertice in vertices.tolist()]
 
         autoSegMask = Image.new('L', imageShape)
         ImageDraw.Draw(autoSegMask).polygon(autoSegCoordinates, outline=1, fill=1)
@@ -250,6 +222,78 @@ class MaskGraphicsView(PGGraphicsView):
         self.newMask.emit(self.mask)
 
 
+    """
+    Updates the mask to match a time-resolved auto segmentation. The mask of the reference frame is displayed and
+    the mask of every frame is kept with the region so the ROI can follow the segmentation across the cine.
+    ================== ===========================================================================
+    **Arguments:**
+    frameVertices      list of Nx2 int ndarrays of vertices of each frame from autosegmentation routine
+    referenceIndex     index of frame the segmentation was started from
+    ================== ===========================================================================
+    """
+    def newAutoSegCine(self, frameVertices, referenceIndex):
+        self.view.removeItem(self.maskItem)
+
+        imageShape = (self.maskItem.image.shape[0], self.maskItem.image.shape[1])
+
+        self.mask = Mask()
+
+        frameMasks = []
+
+        for vertices in frameVertices:
+            autoSegCoordinates = [tuple(vertice) for vertice in vertices.tolist()]
+
+            autoSegMask = Image.new('L', imageShape)
+            ImageDraw.Draw(autoSegMask).polygon(autoSegCoordinates, outline=1, fill=1)
+
+            frameMasks.append(np.array(autoSegMask, dtype=float))
+
+        _region = SegmentationRegion()
+        _region.frameMasks = np.stack(frameMasks)
+        _region.mask = _region.frameMasks[referenceIndex]
+        self.mask.regions.append(_region)
+
+        self.maskItem.setImage(_region.mask)
+        self.view.addItem(self.maskItem)
+        self.maskItem.updateImage()
+
+        self.newMask.emit(self.mask)
+
+
+    """
+    Updates the mask to show vessel candidates. Each candidate becomes a region of it's own named by it's rank
+    ("Candidate 1" is the most likely vessel)
+    ================== ===========================================================================
+    **Arguments:**
+    candidates         list of boolean masks in mask item coordinates from autosegmentation routine
+    ================== ===========================================================================
+    """
+    def newCandidates(self, candidates):
+        self.view.removeItem(self.maskItem)
+
+        imageShape = (self.maskItem.image.shape[0], self.maskItem.image.shape[1])
+
+        self.mask = Mask()
+
+        overallMask = np.zeros(imageShape)
+
+        for rank, candidate in enumerate(candidates, start=1):
+            _region = SegmentationRegion()
+            _region.id = "Candidate %d" % rank
+            _region.mask = candidate.astype(float)
+            self.mask.regions.append(_region)
+
+            overallMask = _region.mask + overallMask
+
+        overallMask[overallMask > 1] = 0
+
+        self.maskItem.setImage(overallMask)
+        self.view.addItem(self.maskItem)
+        self.maskItem.updateImage()
+
+        self.newMask.emit(self.mask)
+
+
 class Mask:
     def __init__(self):
         self.regions = []
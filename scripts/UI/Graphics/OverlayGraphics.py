@@ -1,16 +1,20 @@
 from PyQt5 import QtGui, QtCore
-from PyQt5.QtWidgets import QGraphicsObject, QMenu, QInputDialog, QLineEdit
+from PyQt5.QtWidgets import QGraphicsObject, QMenu, QInputDialog, QLineEdit, QGraphicsPathItem
 from PyQt5.QtCore import Qt, pyqtSignal
-from PyQt5.QtGui import QColor, QPen
+from PyQt5.QtGui import QColor, QPen, QPainterPath
 import math
 import numpy as np
-import cv2 as cv
 
 from scripts.Helper.SegmentationRegion import SegmentationRegion
+from scripts.Helper.VertexGrid import VertexGrid
+from scripts.Helper.VertexStore import VertexStore
+from scripts.ToolBox.MaskOps import MaskOps
 
 
 """
-Widget used to draw overlays on image. Must use same viewbox as image widget.
+Widget used to draw overlays on image. Must use same viewbox as image widget. Each region is rendered as a single
+path item that is extended in place while drawing, so the number of scene items grows with the number of regions
+rather than the length of their contours.
 """
 class OverlayGraphics(QGraphicsObject):
     newOverlay = pyqtSignal(object)
@@ -33,6 +37,20 @@ class OverlayGraphics(QGraphicsObject):
 
         self.overlay = Overlay()
 
+        # region and path being drawn
+        self.region = None
+        self.drawPath = None
+
+        self.maskOps = MaskOps()
+
+        # spatial index of region vertices used for hit testing. regions closer than hitRadius are hit
+        self.vertexGrid = VertexGrid()
+        self.hitRadius = 2
+
+        # region highlighted while the mouse hovers over it
+        self.hoveredRegion = None
+        self.highlightWidth = .4
+
         self.toolBar.overlayBtn.overlaySelected.connect(self.setOverlay)
         self.toolBar.clearBtn.clicked.connect(self.clear)
 
@@ -85,6 +103,7 @@ class OverlayGraphics(QGraphicsObject):
     def subscribe(self):
         self.imageItem.leftMouseDragged.connect(self.drawOnMouseDrag)
         self.imageItem.contextMenuTriggered.connect(self.checkROICollision)
+        self.imageItem.mouseHovered.connect(self.highlightOnHover)
 
     """
     Enables overlay drawing by subscribing to the viewbox's left mouse drag signal 
@@ -102,6 +121,11 @@ class OverlayGraphics(QGraphicsObject):
         except:
             pass
 
+        try:
+            self.imageItem.mouseHovered.disconnect(self.highlightOnHover)
+        except:
+            pass
+
     """
     Draws the overlay while the mouse is being dragged.
     ================== ===========================================================================
@@ -131,25 +155,37 @@ class OverlayGraphics(QGraphicsObject):
 
             self.region.vertices.append(self.prevItemPos)
 
+            self.drawPath = QPainterPath(self.imageView.mapFromItemToView(self.imageItem, self.prevItemPos))
+            self.addPathItem(self.region, self.roiPen)
+
         # if this is the last drag event, close the overlay and clear the regional vertices list
         if ev.isFinish():
             # initialItemPos = self.imageView.mapFromViewToItem(self.imageItem, self.regionVertices[0])
             initialItemPos = self.region.vertices[0]
 
             self.interpolateSegments(currItemPos, prevItemPos=initialItemPos)
+            self.region.pathItem.setPath(self.drawPath)
 
             self.overlay.regions.append(self.region)
+            self.vertexGrid.addRegion(self.region)
 
             # let's emit our vertice groups in image item (coordinates)
             self.newOverlay.emit(self.overlay)
 
+            # the emit rebuilds the overlay from the mask (see newMask). the drawn region is done and must not
+            # be extended by the rest of this event
+            self.region = None
+            self.drawPath = None
+
+            return
+
         # no point in adding redundant vertices
         if currItemPos == self.prevItemPos:
             return
 
-        # no point in adding redundant vertices
-        if self.imageView.mapFromItemToView(self.imageItem, currItemPos) in self.region.vertices[1:]:
-            if self.imageView.mapFromItemToView(self.imageItem, self.prevItemPos) in self.region.vertices[:-1]:
+        # no point in adding redundant vertices. vertex lookups are constant time (see VertexStore)
+        if self.region.vertices.containsAfterFirst(currItemPos):
+            if self.region.vertices.containsBeforeLast(self.prevItemPos):
                 self.prevItemPos = currItemPos
 
                 return
@@ -168,21 +204,18 @@ class OverlayGraphics(QGraphicsObject):
             self.interpolateSegments(currItemPos)
 
         else:
-            prevViewPos = self.imageView.mapFromItemToView(self.imageItem, self.prevItemPos)
-
-            segment = QtGui.QGraphicsLineItem(QtCore.QLineF(prevViewPos, currViewPos))
-            segment.setPen(self.roiPen)
-
-            self.imageView.addItem(segment)
+            self.drawPath.lineTo(currViewPos)
 
             self.region.vertices.append(currItemPos)
-            self.region.segments.append(segment)
+
+        # update the region's path item in place
+        self.region.pathItem.setPath(self.drawPath)
 
         self.prevItemPos = currItemPos
 
     """
     Subroutine to create stepwise segments when distance between prev and curr mouse position is greater 
-    than 1 pixel.
+    than 1 pixel. Segments are appended to the path being drawn.
     """
     def interpolateSegments(self, currItemPos, prevItemPos = None):
         if prevItemPos == None:
@@ -203,6 +236,10 @@ class OverlayGraphics(QGraphicsObject):
         _currItemPos = prevItemPos
         _currViewPos = self.imageView.mapFromItemToView(self.imageItem, _currItemPos)
 
+        # segments start at prevItemPos (e.g. initial vertex when closing the overlay)
+        if self.drawPath.currentPosition() != _currViewPos:
+            self.drawPath.moveTo(_currViewPos)
+
         for step in range(1, stepRange):
             if step == 1:
                 _prevItemPos = prevItemPos
@@ -212,11 +249,8 @@ class OverlayGraphics(QGraphicsObject):
                 _currItemPos = QtCore.QPointF((_prevItemPos.x() + xSign), _prevItemPos.y())
                 _currViewPos = self.imageView.mapFromItemToView(self.imageItem, _currItemPos)
 
-                segment = QtGui.QGraphicsLineItem(QtCore.QLineF(_prevViewPos, _currViewPos))
-                segment.setPen(self.roiPen)
-                self.imageView.addItem(segment)
+                self.drawPath.lineTo(_currViewPos)
                 self.region.vertices.append(_currItemPos)
-                self.region.segments.append(segment)
 
             _prevItemPos = _currItemPos
             _prevViewPos = self.imageView.mapFromItemToView(self.imageItem, _prevItemPos)
@@ -225,11 +259,8 @@ class OverlayGraphics(QGraphicsObject):
                 _currItemPos = QtCore.QPointF(_currItemPos.x(), (_prevItemPos.y() + ySign))
                 _currViewPos = self.imageView.mapFromItemToView(self.imageItem, _currItemPos)
 
-                segment = QtGui.QGraphicsLineItem(QtCore.QLineF(_prevViewPos, _currViewPos))
-                segment.setPen(self.roiPen)
-                self.imageView.addItem(segment)
+                self.drawPath.lineTo(_currViewPos)
                 self.region.vertices.append(_currItemPos)
-                self.region.segments.append(segment)
 
             _prevItemPos = _currItemPos
             _prevViewPos = self.imageView.mapFromItemToView(self.imageItem, _prevItemPos)
@@ -239,11 +270,42 @@ class OverlayGraphics(QGraphicsObject):
     """
     def clear(self):
         for region in self.overlay.regions:
-            if len(region.segments) > 0:
-                for segment in region.segments:
-                    self.imageView.removeItem(segment)
+            if region.pathItem is not None:
+                self.imageView.removeItem(region.pathItem)
 
         self.overlay = Overlay()
+        self.vertexGrid.clear()
+        self.hoveredRegion = None
+
+    """
+    Creates the path item used to render a region and adds it to the view
+    ================== ===========================================================================
+    **Arguments:**
+    region             segmentation region
+    pen                pen used to draw the region
+    ================== ===========================================================================
+    """
+    def addPathItem(self, region, pen):
+        region.pathItem = QGraphicsPathItem()
+        region.pathItem.setPen(pen)
+
+        self.imageView.addItem(region.pathItem)
+
+    """
+    Sets the pen of a region while keeping it's color
+    ================== ===========================================================================
+    **Arguments:**
+    region             segmentation region
+    pen                pen used to draw the region
+    ================== ===========================================================================
+    """
+    def setRegionPen(self, region, pen):
+        if region.pathItem is None:
+            return
+
+        _pen = QPen(pen)
+        _pen.setColor(region.pathItem.pen().color())
+        region.pathItem.setPen(_pen)
 
     """
     Updates the overlay to match the mask.
@@ -259,44 +321,14 @@ class OverlayGraphics(QGraphicsObject):
             mask = region.mask
             mask = np.uint8(mask * 255).T
 
-            # finds all independent contours from a given mask.
-            contours, hierarchy = cv.findContours(image=mask, mode=cv.RETR_TREE, method=cv.CHAIN_APPROX_NONE)
-
-            # iterate over each contour and store in regions
-            for contour in contours:
-                points = []
-
-                # the problem here is findcontours creates diagonals instead of following a perfect
-                # vertical/horizontal path. we can try and fix that here
-                prevX = None
-                prevY = None
-                for point in contour:
-                    x = point[0][0]
-                    y = point[0][1]
-
-                    if prevX and prevY:
-                        dist = math.dist([x, prevY], [prevX, y])
-
-                        if dist > 1:
-                            if (x > prevX) and (y < prevY):
-                                points.append(QtCore.QPointF(prevX, y))
-                            elif (x < prevX) and (y < prevY):
-                                points.append(QtCore.QPointF(x, prevY))
-                            elif (x < prevX) and (y > prevY):
-                                points.append(QtCore.QPointF(prevX, y))
-                            elif (x > prevX) and (y > prevY):
-                                points.append(QtCore.QPointF(x, prevY))
-
-                    prevX = x
-                    prevY = y
-
-                    points.append(QtCore.QPointF(x, y))
-
+            # finds all independent contours from a given mask as rectilinear (x, y) paths
+            for points in self.maskOps.getRectilinearContours(mask):
                 self.region = SegmentationRegion()
                 self.region.color = region.color
                 self.region.id = region.id if region.id is not None else SegmentationRegion.DEFAULT
-                self.region.vertices = points
+                self.region.vertices = VertexStore.fromCoordinates(points)
                 self.overlay.regions.append(self.region)
+                self.vertexGrid.addRegion(self.region)
 
         # iterate over each region and draw segments
         for region in self.overlay.regions:
@@ -310,15 +342,19 @@ class OverlayGraphics(QGraphicsObject):
 
             vertices = region.vertices
 
-            for index, point in enumerate(vertices):
-                if index == 0:
-                    segment = QtGui.QGraphicsLineItem(QtCore.QLineF(vertices[index], vertices[-1]))
-                else:
-                    segment = QtGui.QGraphicsLineItem(QtCore.QLineF(vertices[index], vertices[index - 1]))
+            if not vertices:
+                continue
+
+            # closed path through all vertices
+            path = QPainterPath(vertices[0])
+
+            for vertice in vertices[1:]:
+                path.lineTo(vertice)
+
+            path.closeSubpath()
 
-                segment.setPen(_pen)
-                self.imageView.addItem(segment)
-                region.segments.append(segment)
+            self.addPathItem(region, _pen)
+            region.pathItem.setPath(path)
 
     def checkROICollision(self, ev):
         if not self.enabled:
@@ -330,19 +366,54 @@ class OverlayGraphics(QGraphicsObject):
         except:
             return
 
+        region = self.findRegion(currItemPos)
+
+        if region is not None:
+            self.showContextMenu(ev, region)
+
+    """
+    Finds the region closest to an image item position
+    ================== ===========================================================================
+    **Arguments:**
+    itemPos            image item position
+
+    **Returns:**
+    region             closest region within hit radius (None if no region is hit)
+    ================== ===========================================================================
+    """
+    def findRegion(self, itemPos):
         # clamp item position to image vertices
-        currItemPos = QtCore.QPointF(round(currItemPos.x()), round(currItemPos.y()))
-        currItemPos = [currItemPos.x(), currItemPos.y()]
+        return self.vertexGrid.findRegion(round(itemPos.x()), round(itemPos.y()), self.hitRadius)
 
-        for region in self.overlay.regions:
-            vertices = [[vertice.x(), vertice.y()] for vertice in region.vertices]
+    """
+    Highlights the region the mouse is hovering over
+    ================== ===========================================================================
+    **Arguments:**
+    ev                 hover event
+    ================== ===========================================================================
+    """
+    def highlightOnHover(self, ev):
+        if not self.enabled or ev.isExit():
+            region = None
+
+        else:
+            region = self.findRegion(ev.pos())
+
+        if region is self.hoveredRegion:
+            return
 
-            distances = [math.dist(currItemPos, vertice) for vertice in vertices]
+        self.setHighlighted(self.hoveredRegion, False)
+        self.setHighlighted(region, True)
 
-            if np.min(distances) < 2:
-                self.showContextMenu(ev, region)
+        self.hoveredRegion = region
 
-                return
+    def setHighlighted(self, region, highlighted):
+        if region is None or region.pathItem is None:
+            return
+
+        _pen = QPen(region.pathItem.pen())
+        _pen.setWidthF(self.highlightWidth if highlighted else self.roiPen.widthF())
+        region.pathItem.setPen(_pen)
 
     def showContextMenu(self, ev, region):
         viewPos = self.imageView.mapFromItemToView(self.imageItem, ev.pos())
@@ -369,20 +440,14 @@ class OverlayGraphics(QGraphicsObject):
         if action == setBG:
             region.id = SegmentationRegion.BACKGROUND
 
-            for segment in region.segments:
-                _pen = QPen(self.bgPen)
-                _pen.setColor(segment.pen().color())
-                segment.setPen(_pen)
+            self.setRegionPen(region, self.bgPen)
 
             self.newOverlay.emit(self.overlay)
 
         elif action == setROI:
             region.id = SegmentationRegion.DEFAULT
 
-            for segment in region.segments:
-                _pen = QPen(self.roiPen)
-                _pen.setColor(segment.pen().color())
-                segment.setPen(_pen)
+            self.setRegionPen(region, self.roiPen)
 
             self.newOverlay.emit(self.overlay)
 
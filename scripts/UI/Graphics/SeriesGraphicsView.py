@@ -14,6 +14,7 @@ from scripts.UI.Stats.ImageStats import ImageStats
 from scripts.ToolBox.AutoSegmentation import AutoSegmentation
 from scripts.UI.Cursor import Cursor
 from scripts.Helper.SegmentationRegion import SegmentationRegion
+from scripts.Helper.SparseROI import SparseROI
 
 
 """
@@ -156,12 +157,8 @@ class SeriesGraphicsView(PGImageView):
         if series is None:
             return
 
-        images = []
-
-        for image in series.images:
-            images.append(image.pixel_array)
-
-        imageData = np.array(images)
+        # series volume is shared with other widgets. transpose returns a view, not a copy
+        imageData = series.getVolume()
 
         # pytgraph assumes images are in column-major order (col, row) so we need to transpose data into that format
         imageData = imageData.transpose((0, 2, 1))
@@ -202,36 +199,24 @@ class SeriesGraphicsView(PGImageView):
             regionsGrouped[_id] = list(_regions)
 
         for _id, _regions in regionsGrouped.items():
-            mask = sum(region.mask for region in _regions)
-
-            mask[mask > 1] = 0
-
-            maskCoordinates = np.argwhere(mask)
-            maskCoordinates = [QtCore.QPointF(coordinate[0], coordinate[1]) for coordinate in maskCoordinates]
-
-            maskCoordinates = [[math.floor(coordinate.x()), math.floor(coordinate.y())] for coordinate in
-                               maskCoordinates]
+            # regions with a mask per frame (e.g. auto-segmentation propagated across the cine) make a
+            # time-resolved ROI. static masks apply to every frame
+            if any(region.frameMasks is not None for region in _regions):
+                mask = sum(region.frameMasks if region.frameMasks is not None else region.mask
+                           for region in _regions)
 
-            mask = np.zeros((self.image.shape[1], self.image.shape[2]))
+            else:
+                mask = sum(region.mask for region in _regions)
 
-            x_coords = [c[0] for c in maskCoordinates]
-            y_coords = [c[1] for c in maskCoordinates]
-
-            mask[x_coords, y_coords] = 1
-
-            mask[mask == 0] = np.nan  # convert mask zeros to nan to differentiate between image zeros
-
-            mask = np.ma.masked_invalid(mask)  # create a mask array to handle nan during multiplication
-
-            masked_image = mask * self.image  # multiply masked array by image
-
-            masked_image = masked_image.filled(
-                np.nan)  # convert back to numpy array, filling in masked values with nan
+            mask[mask > 1] = 0
 
-            masked_image = masked_image.transpose((0, 2, 1))  # transpose image back to row-major order (row, col)
+            # ROI in row-major order (row, col). mask item coordinates are column-major (col, row)
+            roi = SparseROI(np.swapaxes(mask.astype(bool), -1, -2))
 
+            # regions share the series volume (native dtype) instead of carrying a masked copy of it
             region = SegmentationRegion()
-            region.image = masked_image
+            region.roi = roi
+            region.image = self.image.transpose((0, 2, 1))  # transpose image back to row-major order (row, col)
             region.id = _id
 
             self.segmentationBundle.regions.append(region)
@@ -52,11 +52,16 @@ class StatusBar(QWidget):
         self.versionFrame.setContentsMargins(0, 0, 0, 0)
         self.versionFrame.setStyleSheet("border: none;")
 
+        self.progressLabel = Label(self.versionFrame)
+        self.progressLabel.setText("")
+
         self.versionLabel = Label(self.labelsFrame)
         self.versionLabel.setText("v1.0.0 alpha")
 
         self.versionLayout = QHBoxLayout(self.versionFrame)
+        self.versionLayout.addWidget(self.progressLabel)
         self.versionLayout.addWidget(self.versionLabel)
+        self.versionLayout.setSpacing(50)
         self.versionLayout.setAlignment(Qt.AlignRight)
         self.versionLayout.setContentsMargins(0, 0, 20, 0)
 
@@ -96,6 +101,22 @@ class StatusBar(QWidget):
 
         self.setLayout(self.uiLayout)
 
+    """
+    Displays progress of a background task
+    ================== ===========================================================================
+    **Arguments:**
+    text               progress text
+    ================== ===========================================================================
+    """
+    def setProgress(self, text):
+        self.progressLabel.setText(text)
+
+    """
+    Clears the progress of a background task
+    """
+    def clearProgress(self):
+        self.progressLabel.setText("")
+
 
 class Label(QLabel):
     def __init__(self, parent):
@@ -113,10 +113,9 @@ class FlowTableView(QWidget):
             return
 
         for region in regions:
-            # Need to convert the image ROIData to phase ROIData. This is necessary because flow can only be
-            # calculated off the phase image, not the magnitude or complex difference image.
-            region.image = flowToolbox.imageROItoPhaseROI(imageROI=region.image, imageSeries=self.series,
-                                                      phaseSeries=phaseSeries)
+            # Need to swap the image volume for the phase volume. This is necessary because flow can only be
+            # calculated off the phase image, not the magnitude or complex difference image. The ROI mask is unchanged
+            region.image = flowToolbox.getPhaseVolume(imageSeries=self.series, phaseSeries=phaseSeries)
 
 
         self.series = phaseSeries
@@ -130,25 +129,17 @@ class FlowTableView(QWidget):
     def runAnalysis(self):
         activePreset = self.presetsPanel.activePreset
 
-        flowPresets = FlowPresets(activePreset.lower())
+        flowPresets = FlowPresets(activePreset)
 
-        for region in self.regions:
-            if activePreset == FlowPresets.AQUEDUCT:
-                singleMeasures, pairedMeasures = flowPresets.getAqueductMeasures(region.image, self.series)
-
-            elif activePreset == FlowPresets.C2_C3_SS:
-                singleMeasures, pairedMeasures = flowPresets.getC2C3Measures(region.image, self.series)
-
-            elif activePreset == FlowPresets.ARTERY:
-                singleMeasures, pairedMeasures = flowPresets.getArteryMeasures(region.image, self.series)
-
-            elif activePreset == FlowPresets.VEIN:
-                singleMeasures, pairedMeasures = flowPresets.getVeinMeasures(region.image, self.series)
+        # regions share the phase volume
+        if self.regions[0].image is None:
+            return
 
-            else:
-                singleMeasures, pairedMeasures = flowPresets.getDefaultMeasures(region.image, self.series)
+        # measures are memoized per region. switching presets re-uses the measures that were already computed
+        measures = flowPresets.getMeasures(self.regions, self.series)
 
-            region.measures = [singleMeasures, pairedMeasures]
+        for region, regionMeasures in zip(self.regions, measures):
+            region.measures = regionMeasures
 
         self.tableView.update(self.regions)
 
@@ -2,7 +2,6 @@ from PyQt5.QtWidgets import QTableWidget, QAbstractScrollArea, QTableWidgetItem,
 from PyQt5.QtWidgets import QFrame, QAbstractItemView
 from PyQt5 import QtWidgets
 from PyQt5.QtCore import Qt, pyqtSignal
-from scripts.DICOM.Sequence import Sequence
 
 
 """
@@ -15,6 +14,9 @@ class PatientTableView(QTableWidget):
     def __init__(self, parent):
         super().__init__()
 
+        # series that are displayed
+        self.displayedSeries = set()
+
         self.initUI()
 
     def initUI(self):
@@ -69,6 +71,8 @@ class PatientTableView(QTableWidget):
         super().clear()
         self.setRowCount(0)
 
+        self.displayedSeries = set()
+
     """
     Loads each series for a given patient and displays it's relevant information
     ================== ===========================================================================
@@ -82,42 +86,66 @@ class PatientTableView(QTableWidget):
         self.setColumnCount(len(self.headers))
         self.setHorizontalHeaderLabels(self.headers)
 
-        patientId = patient.getPatientID()
-
-        for study in patient.studies:
-            studyId = study.getStudyID()
-
-            for series in study.series:
-                sequence = Sequence(refSeries=series, study=study)
-                series.parentSequence = sequence
-
-                sequenceName = str(series.parentSequence.name)
-                seriesNumber = str(series.getSeriesNumber())
-                numImages = str(len(series.images))
-                bpm = str(series.getBPM())
-                venc = str(series.getVenc())
-                seriesType = str(series.getReconstructionType())
-
-                rowPosition = self.rowCount()
-                self.insertRow(rowPosition)
-
-                seriesToggle = Toggle(series)
-                seriesToggle.toggled.connect(self.seriesToggled)
-
-                self.setCellWidget(rowPosition, 0, seriesToggle)
-                self.setItem(rowPosition, 1, CellItem(patientId))
-                self.setItem(rowPosition, 2, CellItem(studyId))
-                self.setItem(rowPosition, 3, CellItem(sequenceName))
-                self.setItem(rowPosition, 4, CellItem(seriesNumber))
-                self.setItem(rowPosition, 5, CellItem(numImages))
-                self.setItem(rowPosition, 6, CellItem(venc))
-                self.setItem(rowPosition, 7, CellItem(seriesType))
-                self.setItem(rowPosition, 8, CellItem(bpm))
+        # patient may still be loading. iterate over a copy of the series loaded so far
+        for study in list(patient.studies):
+            for series in list(study.series):
+                self.displaySeries(patient, study, series)
 
         delegate = AlignDelegate(self)
         self.setItemDelegate(delegate)
         self.adjustColumnWidths()
 
+    """
+    Called when a series of the current patient finishes loading in the background. Appends the series to the table
+    ================== ===========================================================================
+    **Arguments:**
+    loaded             (patient, study, series)
+    ================== ===========================================================================
+    """
+    def addSeries(self, loaded):
+        patient, study, series = loaded
+
+        self.displaySeries(patient, study, series)
+        self.adjustColumnWidths()
+
+    """
+    Displays a series in a new row. Series that are already displayed are skipped.
+    ================== ===========================================================================
+    **Arguments:**
+    patient            patient of series
+    study              study of series
+    series             the series
+    ================== ===========================================================================
+    """
+    def displaySeries(self, patient, study, series):
+        if series in self.displayedSeries:
+            return
+
+        self.displayedSeries.add(series)
+
+        sequenceName = str(series.parentSequence.name)
+        seriesNumber = str(series.getSeriesNumber())
+        numImages = str(len(series.images))
+        bpm = str(series.getBPM())
+        venc = str(series.getVenc())
+        seriesType = str(series.getReconstructionType())
+
+        rowPosition = self.rowCount()
+        self.insertRow(rowPosition)
+
+        seriesToggle = Toggle(series)
+        seriesToggle.toggled.connect(self.seriesToggled)
+
+        self.setCellWidget(rowPosition, 0, seriesToggle)
+        self.setItem(rowPosition, 1, CellItem(str(patient.getPatientID())))
+        self.setItem(rowPosition, 2, CellItem(str(study.getStudyID())))
+        self.setItem(rowPosition, 3, CellItem(sequenceName))
+        self.setItem(rowPosition, 4, CellItem(seriesNumber))
+        self.setItem(rowPosition, 5, CellItem(numImages))
+        self.setItem(rowPosition, 6, CellItem(venc))
+        self.setItem(rowPosition, 7, CellItem(seriesType))
+        self.setItem(rowPosition, 8, CellItem(bpm))
+
     """
     Called when a series is selected. Emits a signal containing active series
     ================== ===========================================================================
@@ -127,6 +155,9 @@ class PatientTableView(QTableWidget):
     """
     def seriesToggled(self, activeToggle):
         if activeToggle.chkBox.isChecked():
+            # patient is loaded lazily. decode the pixel data of the selected series only
+            activeToggle.series.getVolume()
+
             self.seriesSelected.emit(activeToggle.series)
 
         else:
@@ -49,7 +49,7 @@ class SeriesTableView(QTableView):
         if series is None:
             return
 
-        data = series.images[0].dataset  # let's pick the first image in the series to display
+        data = series.images[0].getFullDataset()  # let's pick the first image in the series to display
 
         dataElements = []
 
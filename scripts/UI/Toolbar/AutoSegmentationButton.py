@@ -14,11 +14,17 @@ class AutoSegmentationButton(QToolButton):
         super().__init__(parent)
 
         self.activeContourBtn = None
+        self.activeContourCineBtn = None
+        self.vesselCandidatesBtn = None
+        self.cancelBtn = None
         self.nonIconGraphic = None
 
         self.initUI()
 
         self.activeContourBtn.triggered.connect(lambda x: self.autoSegTriggered(self.activeContourBtn))
+        self.activeContourCineBtn.triggered.connect(lambda x: self.autoSegTriggered(self.activeContourCineBtn))
+        self.vesselCandidatesBtn.triggered.connect(lambda x: self.autoSegTriggered(self.vesselCandidatesBtn))
+        self.cancelBtn.triggered.connect(lambda x: self.autoSegTriggered(self.cancelBtn))
 
     def initUI(self):
         self.activeContourBtn = Action(self)
@@ -26,9 +32,26 @@ class AutoSegmentationButton(QToolButton):
         self.activeContourBtn.setIcon(self.activeContourBtn.iconGraphic)
         self.activeContourBtn.setText("Active Contour")
 
+        self.activeContourCineBtn = Action(self)
+        self.activeContourCineBtn.iconGraphic = QIcon(resource_path('icons/active-contour.png'))
+        self.activeContourCineBtn.setIcon(self.activeContourCineBtn.iconGraphic)
+        self.activeContourCineBtn.setText("Active Contour (All Frames)")
+
+        self.vesselCandidatesBtn = Action(self)
+        self.vesselCandidatesBtn.iconGraphic = QIcon(resource_path('icons/auto-seg.png'))
+        self.vesselCandidatesBtn.setIcon(self.vesselCandidatesBtn.iconGraphic)
+        self.vesselCandidatesBtn.setText("Vessel Candidates")
+
+        self.cancelBtn = Action(self)
+        self.cancelBtn.setText("Cancel")
+        self.cancelBtn.setEnabled(False)
+
         self.setPopupMode(QToolButton.InstantPopup)
 
         self.addAction(self.activeContourBtn)
+        self.addAction(self.activeContourCineBtn)
+        self.addAction(self.vesselCandidatesBtn)
+        self.addAction(self.cancelBtn)
 
         self.setToolTip("Auto Segmentation")
 
@@ -41,6 +64,16 @@ class AutoSegmentationButton(QToolButton):
     def autoSegTriggered(self, autoSegBtn):
         self.autoSegSelected.emit(autoSegBtn)
 
+    """
+    Enables the cancel action while an auto segmentation is running
+    ================== ===========================================================================
+    **Arguments:**
+    running            True if an auto segmentation is running
+    ================== ===========================================================================
+    """
+    def setRunning(self, running):
+        self.cancelBtn.setEnabled(running)
+
 
 class Action(QWidgetAction):
     def __init__(self, parent):
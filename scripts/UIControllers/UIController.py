@@ -1,3 +1,5 @@
+from PyQt5.QtWidgets import QApplication
+
 from scripts.ToolBox.DataWriter import DataWriter
 
 
@@ -38,6 +40,7 @@ class UIController:
         self.setSeriesSelectedCallbacks()
         self.setNewROICallbacks()
         self.linkSeriesMaskViews()
+        self.setShutdownCallbacks()
 
         self.ui_fileTreeView.patientLoaded.connect(lambda: self.ui_lGraphicsPanel.setCurrentIndex(
             self.ui_main.SERIES_GRAPHICS_VIEW))
@@ -51,6 +54,10 @@ class UIController:
         self.ui_fileTreeView.patientLoaded.connect(self.ui_seriesTableView.newPatient)
         self.ui_fileTreeView.patientLoaded.connect(self.ui_flowTableView.newPatient)
 
+        # patient is loaded in the background. series loaded after the patient is displayed are appended
+        self.ui_fileTreeView.seriesLoaded.connect(self.ui_patientTableView.addSeries)
+        self.ui_fileTreeView.loadProgress.connect(self.ui_statusBar.setProgress)
+
     def setSeriesSelectedCallbacks(self):
         self.ui_patientTableView.seriesSelected.connect(self.ui_toolBar.seriesSelected)
         self.ui_patientTableView.seriesSelected.connect(self.ui_seriesGraphicsView.seriesSelected)
@@ -60,11 +67,19 @@ class UIController:
         self.ui_patientTableView.seriesSelected.connect(self.ui_seriesTableView.seriesSelected)
         self.ui_patientTableView.seriesSelected.connect(self.ui_flowTableView.seriesSelected)
 
+        self.ui_patientTableView.seriesSelected.connect(self.autoSeg.seriesSelected)
+
+        # an auto segmentation still running belongs to the previous series
+        self.ui_patientTableView.seriesSelected.connect(lambda series: self.autoSeg.cancelAutoSeg())
+
     def linkSeriesMaskViews(self):
         self.ui_seriesGraphicsView.view.setXLink(self.ui_maskGraphicsView.view)
         self.ui_seriesGraphicsView.view.setYLink(self.ui_maskGraphicsView.view)
         self.overlay.newOverlay.connect(self.ui_maskGraphicsView.newOverlay)
         self.autoSeg.newAutoSeg.connect(self.ui_maskGraphicsView.newAutoSeg)
+        self.autoSeg.newAutoSegCine.connect(self.ui_maskGraphicsView.newAutoSegCine)
+        self.autoSeg.newCandidates.connect(self.ui_maskGraphicsView.newCandidates)
+        self.autoSeg.autoSegProgress.connect(self.ui_statusBar.setProgress)
         self.ui_maskGraphicsView.newMask.connect(self.overlay.newMask)
         self.ui_maskGraphicsView.newMask.connect(self.ui_seriesGraphicsView.newMask)
 
@@ -72,3 +87,13 @@ class UIController:
         self.ui_seriesGraphicsView.newSegmentationBundle.connect(self.ui_flowTableView.newSegmentationBundle)
         self.ui_seriesGraphicsView.newSegmentationBundle.connect(self.ui_flowGraphicsView.newSegmentationBundle)
         self.ui_seriesGraphicsView.newSegmentationBundle.connect(self.dataWriter.newSegmentationBundle)
+
+    def setShutdownCallbacks(self):
+        QApplication.instance().aboutToQuit.connect(self.shutdown)
+
+    """
+    Stops background work before the application exits
+    """
+    def shutdown(self):
+        self.autoSeg.shutdown()
+        self.ui_fileTreeView.decodePool.shutdown()